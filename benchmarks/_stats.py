@@ -0,0 +1,12 @@
+"""
+Statistics shared by the benchmark scripts.
+"""
+
+
+def percentile(values, q):
+    """
+    Returns the `q` quantile (0 to 1) of `values` by nearest rank, or NaN if
+    there are none.
+    """
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))] if values else float("nan")
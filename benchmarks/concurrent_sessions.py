@@ -0,0 +1,116 @@
+"""
+Load test for the shared plan store: many sessions saving, viewing and
+editing plans at the same time, each in its own process.
+
+    python benchmarks/concurrent_sessions.py --sessions 48 --saves 50
+
+Fails (exit status 1) if any operation errors, if a reader ever sees a
+partially written plan, or if a concurrent edit is lost instead of being
+reported as stale.
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from multiprocessing import Pool
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from _stats import percentile  # noqa: E402
+from plan_schema import FIELDS, plan_data  # noqa: E402
+from plan_store import PlanStore, StalePlanError  # noqa: E402
+
+SHARED_OWNER = "shared-desk"
+
+
+def sample_plan(session, n):
+    values = {field.key: "" for field in FIELDS if field.kind in ("text", "textarea")}
+    values.update(stock=f"T{session % 40}", trade_date="2026-10-16", notes=f"session {session} plan {n} " * 20)
+    return plan_data(values)
+
+
+def run_session(args):
+    path, session, saves, shared_id = args
+    own = PlanStore(path, owner=f"trader-{session}")
+    shared = PlanStore(path, owner=SHARED_OWNER)
+    timings = {"save": [], "view": [], "edit": []}
+    result = {"session": session, "errors": [], "torn_reads": 0, "edits": 0, "stale": 0}
+
+    for n in range(saves):
+        try:
+            start = time.perf_counter()
+            plan_id = own.save(sample_plan(session, n), ticker=f"T{session % 40}", trade_date="2026-10-16")
+            timings["save"].append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            own.count(trade_date="2026-10-16")
+            summaries = own.find(limit=25)
+            plan = own.get(plan_id)
+            timings["view"].append(time.perf_counter() - start)
+            if plan is None or plan.data.get("Notes") != sample_plan(session, n)["Notes"] or not summaries:
+                result["torn_reads"] += 1
+
+            # Every session edits the same shared plan; overlapping edits must be reported as stale
+            start = time.perf_counter()
+            shared_plan = shared.get(shared_id)
+            try:
+                shared.update(shared_id, shared_plan.data, shared_plan.ticker, shared_plan.trade_date, shared_plan.revision)
+                result["edits"] += 1
+            except StalePlanError:
+                result["stale"] += 1
+            timings["edit"].append(time.perf_counter() - start)
+        except Exception as e:
+            result["errors"].append(repr(e))
+
+    result["timings"] = timings
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=48)
+    parser.add_argument("--saves", type=int, default=50, help="plans saved (and viewed, and edited) per session")
+    parser.add_argument("--db", help="store file to use (default: a temporary file)")
+    args = parser.parse_args()
+
+    path = args.db or os.path.join(tempfile.mkdtemp(), "load_test.db")
+    shared = PlanStore(path, owner=SHARED_OWNER)
+    shared_id = shared.save(sample_plan(0, 0), ticker="T0", trade_date="2026-10-16")
+
+    start = time.perf_counter()
+    with Pool(args.sessions) as pool:
+        results = pool.map(run_session, [(path, session, args.saves, shared_id) for session in range(args.sessions)])
+    elapsed = time.perf_counter() - start
+
+    errors = [error for result in results for error in result["errors"]]
+    torn_reads = sum(result["torn_reads"] for result in results)
+    edits = sum(result["edits"] for result in results)
+    stale = sum(result["stale"] for result in results)
+    final_revision = shared.get(shared_id).revision
+    lost_updates = (final_revision - 1) - edits
+
+    report = {
+        "sessions": args.sessions,
+        "operations": args.sessions * args.saves * 3,
+        "elapsed_s": round(elapsed, 3),
+        "errors": len(errors),
+        "torn_reads": torn_reads,
+        "edits_applied": edits,
+        "edits_rejected_as_stale": stale,
+        "lost_updates": lost_updates,
+    }
+    for name in ["save", "view", "edit"]:
+        values = [value for result in results for value in result["timings"][name]]
+        report[f"{name}_p50_ms"] = round(statistics.median(values) * 1000, 2)
+        report[f"{name}_p99_ms"] = round(percentile(values, 0.99) * 1000, 2)
+    print(json.dumps(report, indent=2))
+    for error in errors[:10]:
+        print(error, file=sys.stderr)
+    return 1 if errors or torn_reads or lost_updates else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,94 @@
+"""
+Throughput and latency test for the live level-alert watcher: a paced tick
+stream across hundreds of symbols against the levels of thousands of plans.
+
+    python benchmarks/level_alerts.py --symbols 500 --plans-per-symbol 10 --rate 5000 --seconds 10
+
+Fails (exit status 1) if the watcher falls behind the requested tick rate or
+if the p99 tick-to-alert latency exceeds --max-latency-ms.
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from _stats import percentile  # noqa: E402
+from level_alerts import LevelWatcher, plan_levels  # noqa: E402
+
+
+def sample_plans(symbols, plans_per_symbol, rng):
+    rows = []
+    for s in range(symbols):
+        base = rng.uniform(20, 500)
+        for _ in range(plans_per_symbol):
+            price = base * rng.uniform(0.98, 1.02)
+            rows.append({
+                "plan_id": len(rows) + 1, "owner": "bench", "ticker": f"S{s:04d}",
+                "level_of_interest": f"{price:.2f}-{price * 1.002:.2f}", "resistance_2": price * 1.02,
+                "resistance_1": price * 1.01, "pivot_point": price, "support_1": price * 0.99,
+                "support_2": price * 0.98, "stop_loss": f"{price * 0.985:.2f}", "target": f"{price * 1.03:.2f}",
+            })
+    return pd.DataFrame(rows)
+
+
+async def paced_ticks(levels, rate, seconds, rng):
+    symbols = levels["symbol"].unique()
+    prices = levels.groupby("symbol")["low"].median().to_dict()
+    count = int(rate * seconds)
+    picks = rng.choice(symbols, count)
+    moves = 1 + rng.normal(0, 0.0005, count)
+    started = time.perf_counter()
+    for i in range(count):
+        ahead = i / rate - (time.perf_counter() - started)
+        if ahead > 0:
+            await asyncio.sleep(ahead)
+        symbol = picks[i]
+        prices[symbol] *= moves[i]
+        yield symbol, prices[symbol], i
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--symbols", type=int, default=500)
+    parser.add_argument("--plans-per-symbol", type=int, default=10)
+    parser.add_argument("--rate", type=int, default=5000, help="ticks per second")
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--max-latency-ms", type=float, default=50)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    levels = plan_levels(sample_plans(args.symbols, args.plans_per_symbol, rng))
+    latencies = []
+    watcher = LevelWatcher(levels, lambda alerts: latencies.extend(alert.latency_ms for alert in alerts))
+
+    start = time.perf_counter()
+    asyncio.run(watcher.run(paced_ticks(levels, args.rate, args.seconds, rng)))
+    elapsed = time.perf_counter() - start
+
+    report = {
+        "symbols": args.symbols,
+        "levels": len(levels),
+        "ticks": watcher.stats.ticks,
+        "elapsed_s": round(elapsed, 3),
+        "ticks_per_s": round(watcher.stats.ticks / elapsed),
+        "alerts": watcher.stats.alerts,
+        "latency_p50_ms": round(statistics.median(latencies), 3) if latencies else None,
+        "latency_p99_ms": round(percentile(latencies, 0.99), 3) if latencies else None,
+        "latency_max_ms": round(watcher.stats.max_latency_ms, 3),
+    }
+    print(json.dumps(report, indent=2))
+    behind = report["ticks_per_s"] < 0.95 * args.rate
+    slow = latencies and percentile(latencies, 0.99) > args.max_latency_ms
+    return 1 if behind or slow else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,248 @@
+"""
+Headless latency benchmarks for the planner and view pages, driven through
+Streamlit's AppTest.
+
+    python benchmarks/page_latency.py --output bench.json
+
+Measures import and cold-start time (each in a fresh interpreter), full
+reruns of the planner page, saving a plan through the form (and checking that
+the backtest reads its Level of Interest range as the midpoint), its sidebar
+Fill Key Levels and Detect Intraday Levels actions, and loading the view and
+journal analytics pages over synthetic histories of 1, 1k, 10k and 100k
+plans. Prints the results as JSON and fails (exit status 1) if any result is
+above its threshold in benchmarks/thresholds.json.
+"""
+import argparse
+import datetime
+import json
+import os
+import random
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from _stats import percentile  # noqa: E402
+from plan_schema import FIELDS, plan_data  # noqa: E402
+from plan_store import PlanStore  # noqa: E402
+from scenario_backtest import plan_levels  # noqa: E402
+
+PLANNER_PAGE = os.path.join(ROOT, "pages", "1_trade_planner.py")
+VIEW_PAGE = os.path.join(ROOT, "pages", "2_view_trade_plans.py")
+ANALYTICS_PAGE = os.path.join(ROOT, "pages", "7_journal_analytics.py")
+DEFAULT_THRESHOLDS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "thresholds.json")
+HISTORY_SIZES = [1, 1_000, 10_000, 100_000]
+TRADER = "bench"
+TIMEOUT = 120
+
+# Run in a fresh interpreter, so nothing is imported or cached yet
+_IMPORT_SCRIPT = """
+import time
+start = time.perf_counter()
+import streamlit, pandas, pyarrow
+import plan_schema, plan_store, plan_search, risk, levels, intraday_levels, scenario_backtest, trader_session
+print(time.perf_counter() - start)
+"""
+_COLD_START_SCRIPT = """
+import time
+start = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file({page!r}, default_timeout={timeout})
+at.session_state["trader"] = {trader!r}
+at.run()
+assert not at.exception, at.exception
+print(time.perf_counter() - start)
+"""
+
+
+def fresh_interpreter(script, db):
+    env = dict(os.environ, TRADE_PLANNER_DB=db, PYTHONPATH=ROOT)
+    result = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, cwd=ROOT, env=env, check=True)
+    return float(result.stdout.strip().splitlines()[-1]) * 1000
+
+
+def timed(function, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def app(page):
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(page, default_timeout=TIMEOUT)
+    at.session_state["trader"] = TRADER
+    return at
+
+
+def check(at):
+    if at.exception:
+        raise RuntimeError(at.exception[0].message)
+    return at
+
+
+def synthetic_history(path, size):
+    """
+    Fills a store file with `size` plans for TRADER across 40 tickers and a
+    year of trade dates, with a few narrative fields and checklist boxes
+    filled in each.
+    """
+    store = PlanStore(path)
+    rng = random.Random(size)
+    texts = [field.key for field in FIELDS if field.kind == "textarea"]
+    checkboxes = [field.key for field in FIELDS if field.kind == "checkbox"]
+    start = datetime.date(2025, 1, 1)
+    rows = []
+    for n in range(size):
+        ticker = f"T{n % 40:02d}"
+        values = {key: f"plan {n} {key.replace('_', ' ')} notes" for key in rng.sample(texts, 8)}
+        values.update({key: rng.random() < 0.9 for key in checkboxes})
+        values.update(stock=ticker, overall_bias=rng.choice(["Bullish", "Bearish", "Neutral"]), current_price=100 + n % 50)
+        data = {column: value for column, value in plan_data(values).items() if value not in (None, "")}
+        trade_date = (start + datetime.timedelta(days=n % 365)).isoformat()
+        rows.append((TRADER, ticker, trade_date, f"{trade_date}T08:00:00", json.dumps(data, default=str)))
+    with sqlite3.connect(path) as conn:
+        conn.executemany("INSERT INTO plans (owner, ticker, trade_date, created_at, data) VALUES (?, ?, ?, ?, ?)", rows)
+    store.rebuild_search_index()
+    store.rebuild_rollups()
+
+
+def market_data(workdir):
+    """
+    Writes a year of daily bars and one session of 1-minute bars for TRADER's
+    BENCH symbol, and returns their paths and the session date.
+    """
+    rng = np.random.default_rng(0)
+    days = pd.bdate_range("2025-01-02", "2025-12-31")
+    close = 100 + np.cumsum(rng.normal(0, 1, len(days)))
+    daily = pd.DataFrame({"symbol": "BENCH", "date": days, "high": close + 1, "low": close - 1, "close": close})
+    daily_path = os.path.join(workdir, "daily.csv")
+    daily.to_csv(daily_path, index=False)
+
+    session = days[-1].date()
+    minutes = pd.date_range(f"{session} 09:30", periods=390, freq="min")
+    price = close[-1] + np.cumsum(rng.normal(0, 0.1, len(minutes)))
+    minute = pd.DataFrame({"symbol": "BENCH", "timestamp": minutes, "high": price + 0.05, "low": price - 0.05, "close": price})
+    minute_path = os.path.join(workdir, "minute.parquet")
+    minute.to_parquet(minute_path)
+    return daily_path, minute_path, session
+
+
+def click_sidebar(at, label, status):
+    """
+    Clicks a planner sidebar button and fails unless its status message is a success.
+    """
+    [button for button in at.sidebar.button if button.label == label][0].click()
+    check(at.run())
+    kind, message = at.session_state[status]
+    if kind != "success":
+        raise RuntimeError(f"{label}: {message}")
+
+
+def run(args, workdir):
+    import streamlit as st
+
+    results = {}
+    db = os.path.join(workdir, "planner.db")
+    os.environ["TRADE_PLANNER_DB"] = db
+
+    results["import_ms"] = statistics.median(fresh_interpreter(_IMPORT_SCRIPT, db) for _ in range(args.repeat_cold))
+    cold = _COLD_START_SCRIPT.format(page=PLANNER_PAGE, timeout=TIMEOUT, trader=TRADER)
+    results["planner_cold_start_ms"] = statistics.median(fresh_interpreter(cold, db) for _ in range(args.repeat_cold))
+
+    planner = check(app(PLANNER_PAGE).run())
+    reruns = timed(lambda: check(planner.run()), args.repeat)
+    results["planner_rerun_p50_ms"] = statistics.median(reruns)
+    results["planner_rerun_p95_ms"] = percentile(reruns, 0.95)
+
+    def save():
+        planner.text_input(key="stock").set_value("BENCH")
+        planner.text_input(key="level_of_interest").set_value("123-123.5 range")
+        [button for button in planner.button if button.label == "Save Trading Plan"][0].click()
+        check(planner.run())
+        if not planner.success:
+            raise RuntimeError("The plan was not saved")
+
+    saves = timed(save, args.repeat)
+    results["save_p50_ms"] = statistics.median(saves)
+    results["save_p95_ms"] = percentile(saves, 0.95)
+    store = PlanStore(db, TRADER)
+    saved = store.get(store.find(limit=1)[0].plan_id)
+    # The backtest reads a range as its midpoint, not as two signed numbers
+    if plan_levels([saved.data])[0]["level_of_interest"] != 123.25:
+        raise RuntimeError("The saved Level of Interest range was not read as 123.25")
+
+    daily_path, minute_path, session = market_data(workdir)
+    planner.text_input(key="sidebar_symbol").set_value("BENCH")
+    planner.text_input(key="levels_path").set_value(daily_path)
+    planner.text_input(key="intraday_path").set_value(minute_path)
+    planner.date_input(key="intraday_date").set_value(session)
+    results["fill_key_levels_ms"] = statistics.median(timed(lambda: click_sidebar(planner, "Fill Key Levels", "levels_status"), args.repeat))
+    if not planner.number_input(key="pivot_point").value:
+        raise RuntimeError("Fill Key Levels did not fill the Pivot Point")
+    results["detect_intraday_levels_ms"] = statistics.median(
+        timed(lambda: click_sidebar(planner, "Detect Intraday Levels", "intraday_status"), args.repeat)
+    )
+
+    for size in args.sizes:
+        db = os.path.join(workdir, f"history_{size}.db")
+        synthetic_history(db, size)
+        os.environ["TRADE_PLANNER_DB"] = db
+        st.cache_data.clear()
+        view = app(VIEW_PAGE)
+        results[f"view_load_{size}_ms"] = timed(lambda: check(view.run()), 1)[0]
+        if not view.markdown:
+            raise RuntimeError(f"The view page showed no plan for a history of {size}")
+        # Later loads are answered from the page's caches until the store changes
+        results[f"view_rerun_{size}_ms"] = statistics.median(timed(lambda: check(view.run()), args.repeat))
+
+        analytics = app(ANALYTICS_PAGE)
+        # The whole year of synthetic trade dates
+        analytics.session_state["analytics_end"] = datetime.date(2025, 12, 31)
+        analytics.session_state["analytics_weeks"] = 53
+        results[f"analytics_load_{size}_ms"] = timed(lambda: check(analytics.run()), 1)[0]
+        if not analytics.metric:
+            raise RuntimeError(f"The analytics page showed no rollups for a history of {size}")
+        results[f"analytics_rerun_{size}_ms"] = statistics.median(timed(lambda: check(analytics.run()), args.repeat))
+    return {name: round(value, 2) for name, value in results.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=HISTORY_SIZES, help="plan history sizes for the view page")
+    parser.add_argument("--repeat", type=int, default=10, help="timed runs per warm measurement")
+    parser.add_argument("--repeat-cold", type=int, default=3, help="fresh interpreters per cold measurement")
+    parser.add_argument("--thresholds", default=DEFAULT_THRESHOLDS, help="JSON file of maximum milliseconds per result")
+    parser.add_argument("--output", help="also write the results to this JSON file")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        results = run(args, workdir)
+
+    with open(args.thresholds) as f:
+        thresholds = json.load(f)
+    regressions = {
+        name: {"result_ms": results[name], "threshold_ms": limit}
+        for name, limit in thresholds.items() if name in results and results[name] > limit
+    }
+    report = {"results": results, "thresholds": thresholds, "regressions": regressions}
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
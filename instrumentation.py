@@ -0,0 +1,90 @@
+import collections
+import contextlib
+import json
+import os
+import threading
+import time
+
+import pandas as pd
+
+# Number of timings kept in memory, across all sessions of the server
+RING_SIZE = 20_000
+# If set, every timing is also appended to this JSON-lines file
+METRICS_FILE_ENV = "TRADE_PLANNER_METRICS"
+KINDS = ["page", "section", "io"]
+
+_timings = collections.deque(maxlen=RING_SIZE)
+_lock = threading.Lock()
+
+
+def record(kind, name, wall_ms, **measures):
+    """
+    Records one timing ("page", "section" or "io") with any extra measures,
+    e.g. widgets, state_bytes, bytes_read or bytes_written.
+    """
+    timing = {"time": time.time(), "kind": kind, "name": name, "wall_ms": wall_ms, **measures}
+    with _lock:
+        _timings.append(timing)
+        path = os.environ.get(METRICS_FILE_ENV)
+        if path:
+            with open(path, "a") as f:
+                f.write(json.dumps(timing, default=str) + "\n")
+
+
+@contextlib.contextmanager
+def timed_io(name):
+    """
+    Times a storage call. The block can add measures (such as bytes_read or
+    bytes_written) to the yielded dict.
+    """
+    measures = {}
+    start = time.perf_counter()
+    try:
+        yield measures
+    finally:
+        record("io", name, (time.perf_counter() - start) * 1000, **measures)
+
+
+def timings():
+    """
+    Returns a copy of the buffered timings, oldest first.
+    """
+    with _lock:
+        return list(_timings)
+
+
+def clear():
+    with _lock:
+        _timings.clear()
+
+
+def export(timings):
+    """
+    Returns timings as JSON-lines text, one timing per line.
+    """
+    return "".join(json.dumps(timing, default=str) + "\n" for timing in timings)
+
+
+def summarize(timings):
+    """
+    Aggregates timings per kind and name: count, p50/p99/max wall time and the
+    average or total of the other measures.
+    """
+    frame = pd.DataFrame(timings)
+    if frame.empty:
+        return pd.DataFrame(columns=["kind", "name", "count", "p50_ms", "p99_ms", "max_ms"])
+    for column in ["widgets", "state_bytes", "bytes_read", "bytes_written"]:
+        if column not in frame:
+            frame[column] = float("nan")
+    grouped = frame.groupby(["kind", "name"], sort=False)
+    summary = grouped.agg(
+        count=("wall_ms", "size"),
+        p50_ms=("wall_ms", "median"),
+        p99_ms=("wall_ms", lambda wall: wall.quantile(0.99)),
+        max_ms=("wall_ms", "max"),
+        widgets=("widgets", "mean"),
+        state_bytes=("state_bytes", "max"),
+        bytes_read=("bytes_read", "sum"),
+        bytes_written=("bytes_written", "sum"),
+    )
+    return summary.sort_values("p99_ms", ascending=False).reset_index()
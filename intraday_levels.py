@@ -0,0 +1,157 @@
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+from numpy.lib.stride_tricks import sliding_window_view
+from pyarrow import fs
+
+from instrumentation import timed_io
+
+BAR_COLUMNS = ["symbol", "timestamp", "high", "low", "close"]
+
+
+def _file_format(path):
+    if str(path).lower().endswith((".arrow", ".feather", ".ipc")):
+        return "ipc"
+    return "parquet"
+
+
+def read_minute_bars(path, symbols=None, start=None, end=None, columns=BAR_COLUMNS):
+    """
+    Reads 1-minute bars from a Parquet or Arrow IPC (Feather) file.
+
+    The file is memory-mapped. Only the requested columns, and the row groups
+    that overlap the requested symbols and [start, end) time range, are
+    materialized, so a multi-month history is never loaded as a whole.
+    """
+    dataset = ds.dataset(str(path), format=_file_format(path), filesystem=fs.LocalFileSystem(use_mmap=True))
+    timestamp_type = dataset.schema.field("timestamp").type
+
+    condition = None
+    if symbols is not None:
+        condition = ds.field("symbol").isin([str(symbol).upper() for symbol in symbols])
+    for bound, op in [(start, "__ge__"), (end, "__lt__")]:
+        if bound is not None:
+            clause = getattr(ds.field("timestamp"), op)(pa.scalar(pd.Timestamp(bound), type=timestamp_type))
+            condition = clause if condition is None else condition & clause
+
+    with timed_io("intraday_levels.read_minute_bars") as io:
+        table = dataset.to_table(columns=list(columns), filter=condition)
+        io["bytes_read"] = table.nbytes
+    bars = table.to_pandas()
+    return bars.sort_values(["symbol", "timestamp"], kind="stable", ignore_index=True)
+
+
+def _window_extreme(values, window, side, reduce, fill):
+    """
+    For every bar, reduces the `window` values before (side="left") or after
+    (side="right") it, without including the bar itself.
+    """
+    pad = (window, 0) if side == "left" else (0, window)
+    windows = sliding_window_view(np.pad(values, pad, constant_values=fill), window + 1)
+    return reduce(windows[:, :-1] if side == "left" else windows[:, 1:], axis=1)
+
+
+def find_swings(bars, window=5, min_reversal=0.002):
+    """
+    Finds sharp-reversal swing points in bars sorted by symbol and timestamp.
+
+    A swing high is a bar whose high is above the `window` bars before it and
+    not below the `window` bars after it, and after which price falls by at
+    least `min_reversal` (a fraction of price) within those `window` bars.
+    Swing lows mirror this. Windows never straddle two symbols.
+
+    Returns a frame with symbol, timestamp, price and kind
+    ("resistance" for swing highs, "support" for swing lows).
+    """
+    if bars.empty:
+        # e.g. a session date the file has no bars for
+        return pd.DataFrame(columns=["symbol", "timestamp", "price", "kind"])
+    high = bars["high"].to_numpy(dtype=np.float64)
+    low = bars["low"].to_numpy(dtype=np.float64)
+
+    # Position of each bar within its symbol, to mask windows that cross symbols
+    symbol = bars["symbol"].to_numpy()
+    starts = np.r_[True, symbol[1:] != symbol[:-1]]
+    group_start = np.maximum.accumulate(np.where(starts, np.arange(len(bars)), 0))
+    sizes = np.diff(np.r_[np.flatnonzero(starts), len(bars)])
+    position = np.arange(len(bars)) - group_start
+    size = np.repeat(sizes, sizes)
+    complete = (position >= window) & (position < size - window)
+
+    is_high = (
+        complete
+        & (high > _window_extreme(high, window, "left", np.max, -np.inf))
+        & (high >= _window_extreme(high, window, "right", np.max, -np.inf))
+        & (high - _window_extreme(low, window, "right", np.min, np.inf) >= min_reversal * high)
+    )
+    is_low = (
+        complete
+        & (low < _window_extreme(low, window, "left", np.min, np.inf))
+        & (low <= _window_extreme(low, window, "right", np.min, np.inf))
+        & (_window_extreme(high, window, "right", np.max, -np.inf) - low >= min_reversal * low)
+    )
+
+    swing_highs = pd.DataFrame({"symbol": symbol[is_high], "timestamp": bars["timestamp"].to_numpy()[is_high], "price": high[is_high], "kind": "resistance"})
+    swing_lows = pd.DataFrame({"symbol": symbol[is_low], "timestamp": bars["timestamp"].to_numpy()[is_low], "price": low[is_low], "kind": "support"})
+    return pd.concat([swing_highs, swing_lows], ignore_index=True)
+
+
+def cluster_levels(swings, tolerance=0.001):
+    """
+    Groups swing points of the same symbol and kind whose prices lie within
+    `tolerance` (a fraction of price) of each other into levels.
+
+    Returns a frame with symbol, kind, price (mean of the cluster), touches
+    and last_touch, sorted by symbol, kind and descending touches.
+    """
+    if swings.empty:
+        return pd.DataFrame(columns=["symbol", "kind", "price", "touches", "last_touch"])
+
+    swings = swings.sort_values(["symbol", "kind", "price"], ignore_index=True)
+    price = swings["price"].to_numpy()
+    same_group = (swings["symbol"].to_numpy()[1:] == swings["symbol"].to_numpy()[:-1]) & (
+        swings["kind"].to_numpy()[1:] == swings["kind"].to_numpy()[:-1]
+    )
+    close_enough = np.diff(price) <= tolerance * price[:-1]
+    cluster = np.r_[0, np.cumsum(~(same_group & close_enough))]
+
+    levels = swings.groupby(cluster).agg(
+        symbol=("symbol", "first"),
+        kind=("kind", "first"),
+        price=("price", "mean"),
+        touches=("price", "size"),
+        last_touch=("timestamp", "max"),
+    )
+    return levels.sort_values(["symbol", "kind", "touches", "last_touch"], ascending=[True, True, False, False], ignore_index=True)
+
+
+def detect_levels(bars, window=5, min_reversal=0.002, tolerance=0.001):
+    """
+    Detects intraday support and resistance levels for every symbol in `bars`.
+    """
+    return cluster_levels(find_swings(bars, window, min_reversal), tolerance)
+
+
+def format_levels(levels, symbol, kind, limit=5):
+    """
+    Formats a symbol's strongest levels of one kind for the form, e.g.
+    "123.45 (3 touches), 122.10 (2 touches)".
+    """
+    rows = levels[(levels["symbol"] == symbol) & (levels["kind"] == kind)].head(limit)
+    return ", ".join(
+        f"{price:.2f} ({touches} touch{'es' if touches != 1 else ''})"
+        for price, touches in zip(rows["price"], rows["touches"])
+    )
+
+
+def has_confluence(prices, market_levels, tolerance=0.001):
+    """
+    Returns True if any detected price lies within `tolerance` (a fraction of
+    price) of any market-recognized level.
+    """
+    prices = np.asarray(prices, dtype=np.float64)
+    market_levels = np.asarray([level for level in market_levels if level], dtype=np.float64)
+    if prices.size == 0 or market_levels.size == 0:
+        return False
+    return bool((np.abs(prices[:, None] - market_levels[None, :]) <= tolerance * market_levels[None, :]).any())
@@ -0,0 +1,389 @@
+import asyncio
+import bisect
+import collections
+import datetime
+import threading
+import time
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+from plan_schema import FIELDS_BY_KEY
+from risk import parse_price_ranges
+
+# Plan fields watched for alerts, by field key
+ALERT_FIELDS = [
+    "level_of_interest", "resistance_2", "resistance_1", "pivot_point", "support_1", "support_2",
+    "stop_loss", "target",
+]
+# A level is "approached" when price comes within this percentage of it
+APPROACH_PCT = 0.1
+QUEUE_SIZE = 10_000
+
+
+@dataclass
+class Alert:
+    """
+    A level event for one plan. `latency_ms` is the time from the tick
+    entering the watcher's queue to the alert being raised.
+    """
+    timestamp: object
+    symbol: str
+    price: float
+    plan_id: int
+    owner: str
+    level: str
+    kind: str
+    message: str
+    latency_ms: float = None
+
+
+def plan_levels(plans):
+    """
+    Turns a frame of plans (plan_id, owner, ticker and the ALERT_FIELDS, by
+    key) into one row per price level: plan_id, owner, symbol, level, low and
+    high. Ranges such as "123-123.5" keep both bounds; unset levels are dropped.
+    """
+    levels = []
+    for key in ALERT_FIELDS:
+        bounds = parse_price_ranges(plans[key])
+        levels.append(pd.DataFrame({
+            "plan_id": plans["plan_id"].to_numpy(),
+            "owner": plans["owner"].to_numpy(),
+            "symbol": plans["ticker"].str.upper().to_numpy(),
+            "level": FIELDS_BY_KEY[key].label,
+            "low": bounds["low"].to_numpy(),
+            "high": bounds["high"].to_numpy(),
+        }))
+    levels = pd.concat(levels, ignore_index=True)
+    return levels[(levels["low"] > 0) & (levels["symbol"] != "")].reset_index(drop=True)
+
+
+def load_levels(store, trade_date):
+    """
+    Reads only the alert fields of a day's plans from the store and returns their levels.
+    """
+    columns = [FIELDS_BY_KEY[key].column for key in ALERT_FIELDS]
+    plans = store.frame(columns, trade_date=trade_date)
+    return plan_levels(plans.rename(columns={FIELDS_BY_KEY[key].column: key for key in ALERT_FIELDS}))
+
+
+def _format_level(low, high):
+    return f"{low:g}–{high:g} range" if high > low else f"{low:g}"
+
+
+class LevelIndex:
+    """
+    The price levels of the active plans, as one sorted list of level bounds
+    per symbol.
+
+    Each tick is checked with two binary searches: one for the bounds between
+    the symbol's previous price and this one (crossings), and one for the
+    bounds within APPROACH_PCT of this price (approaches). Its cost grows with
+    the log of the number of levels, not with the number of plans.
+    """
+
+    def __init__(self, levels, approach_pct=APPROACH_PCT, last_prices=None, near=None):
+        self.size = len(levels)
+        self.approach = approach_pct / 100
+        self.last_price = dict(last_prices or {})
+        # symbol -> (plan_id, level) pairs price is currently near, so an
+        # approach is reported once, not on every tick
+        self.near = dict(near or {})
+        self._low = levels["low"].tolist()
+        self._high = levels["high"].tolist()
+        self._plan_id = levels["plan_id"].tolist()
+        self._owner = levels["owner"].tolist()
+        self._level = levels["level"].tolist()
+        self._bounds = {}
+        for symbol, group in levels.groupby("symbol", sort=False):
+            prices = np.r_[group["low"].to_numpy(), group["high"].to_numpy()]
+            ids = np.r_[group.index.to_numpy(), group.index.to_numpy()]
+            order = np.argsort(prices, kind="stable")
+            self._bounds[symbol] = (prices[order].tolist(), ids[order].tolist())
+
+    def _side(self, i, price):
+        # -1 below the level, 0 inside it, 1 above it
+        return -1 if price < self._low[i] else 1 if price > self._high[i] else 0
+
+    def _alert(self, i, symbol, price, timestamp, kind, message):
+        return Alert(timestamp, symbol, price, self._plan_id[i], self._owner[i], self._level[i], kind, message)
+
+    def update(self, symbol, price, timestamp=None):
+        """
+        Records a new price for a symbol and returns the alerts it raises.
+        """
+        last = self.last_price.get(symbol)
+        self.last_price[symbol] = price
+        if symbol not in self._bounds:
+            return []
+        prices, ids = self._bounds[symbol]
+        alerts = []
+
+        crossed = {}
+        if last is not None and last != price:
+            start = bisect.bisect_left(prices, min(last, price))
+            stop = bisect.bisect_right(prices, max(last, price))
+            crossed = dict.fromkeys(ids[start:stop])
+        for i in crossed:
+            before, after = self._side(i, last), self._side(i, price)
+            if before == after:
+                continue
+            level = _format_level(self._low[i], self._high[i])
+            direction = "above" if after > before else "below"
+            if after == 0:
+                kind, message = "enter", f"price entered {level} ({self._level[i]})"
+            elif before == 0:
+                kind, message = "break", f"broke {direction} {self._level[i]} {level}"
+            elif self._high[i] > self._low[i]:
+                kind, message = "blow_through", f"blew through {self._level[i]} {level} ({'up' if after > 0 else 'down'})"
+            else:
+                kind, message = "cross", f"crossed {direction} {self._level[i]} {level}"
+            alerts.append(self._alert(i, symbol, price, timestamp, kind, message))
+
+        band = price * self.approach
+        start = bisect.bisect_left(prices, price - band)
+        stop = bisect.bisect_right(prices, price + band)
+        near = {(self._plan_id[i], self._level[i]): i for i in ids[start:stop] if self._side(i, price) != 0}
+        previous = self.near.get(symbol, ())
+        for key, i in near.items():
+            if key in previous or i in crossed:
+                continue
+            side = "below" if self._side(i, price) < 0 else "above"
+            level = _format_level(self._low[i], self._high[i])
+            alerts.append(self._alert(i, symbol, price, timestamp, "approach", f"approaching {self._level[i]} {level} from {side}"))
+        self.near[symbol] = set(near)
+        return alerts
+
+
+@dataclass
+class WatcherStats:
+    ticks: int = 0
+    alerts: int = 0
+    max_latency_ms: float = 0.0
+    started: float = field(default_factory=time.perf_counter)
+
+
+class LevelWatcher:
+    """
+    Checks a stream of ticks against a LevelIndex and hands the alerts to `on_alerts`.
+
+    Ticks go through a bounded queue: a producer that outpaces the watcher
+    waits instead of letting the backlog (and so the alert latency) grow
+    without limit. Whatever is queued is processed as one batch.
+    """
+
+    def __init__(self, levels, on_alerts, approach_pct=APPROACH_PCT, queue_size=QUEUE_SIZE):
+        self.index = LevelIndex(levels, approach_pct)
+        self.on_alerts = on_alerts
+        self.queue_size = queue_size
+        self.stats = WatcherStats()
+
+    def set_levels(self, levels):
+        """
+        Replaces the watched levels (e.g. after a plan was saved), keeping the
+        last prices and which levels price is already near.
+        """
+        self.index = LevelIndex(levels, self.index.approach * 100, self.index.last_price, self.index.near)
+
+    async def run(self, ticks):
+        """
+        Consumes an async iterable of (symbol, price, timestamp) ticks until it ends.
+        """
+        queue = asyncio.Queue(self.queue_size)
+        failure = None
+
+        async def produce():
+            nonlocal failure
+            try:
+                async for tick in ticks:
+                    await queue.put((tick, time.perf_counter()))
+            except Exception as e:
+                failure = e
+            await queue.put(None)
+
+        producer = asyncio.create_task(produce())
+        try:
+            done = False
+            while not done:
+                batch = [await queue.get()]
+                while not queue.empty():
+                    batch.append(queue.get_nowait())
+                alerts = []
+                for item in batch:
+                    if item is None:
+                        done = True
+                        break
+                    (symbol, price, timestamp), received = item
+                    self.stats.ticks += 1
+                    raised = self.index.update(symbol, price, timestamp)
+                    if raised:
+                        latency = (time.perf_counter() - received) * 1000
+                        for alert in raised:
+                            alert.latency_ms = latency
+                        self.stats.max_latency_ms = max(self.stats.max_latency_ms, latency)
+                        alerts.extend(raised)
+                if alerts:
+                    self.stats.alerts += len(alerts)
+                    self.on_alerts(alerts)
+        finally:
+            producer.cancel()
+        if failure is not None:
+            raise failure
+
+
+def read_ticks(path):
+    """
+    Reads a tick file (symbol, timestamp, price) or a bar file (symbol,
+    timestamp, close) from CSV, Parquet or Arrow IPC, in timestamp order.
+    """
+    path = str(path)
+    if path.lower().endswith(".csv"):
+        frame = pd.read_csv(path, parse_dates=["timestamp"])
+    elif path.lower().endswith((".arrow", ".feather", ".ipc")):
+        frame = pd.read_feather(path)
+    else:
+        frame = pd.read_parquet(path)
+    price = "price" if "price" in frame else "close"
+    frame = frame[["symbol", "timestamp", price]].rename(columns={price: "price"})
+    frame["symbol"] = frame["symbol"].astype(str).str.upper()
+    return frame.sort_values("timestamp", kind="stable", ignore_index=True)
+
+
+async def replay_ticks(path, speed=None):
+    """
+    Replays a tick or bar file (see read_ticks) as (symbol, price, timestamp)
+    ticks. With a `speed`, ticks are paced at that multiple of real time;
+    without one, they are replayed as fast as the watcher takes them.
+    """
+    frame = read_ticks(path)
+    timestamps = frame["timestamp"].to_numpy()
+    offsets = (timestamps - timestamps[0]) / np.timedelta64(1, "s") if len(frame) else []
+    started = time.perf_counter()
+    for i, (symbol, price, timestamp) in enumerate(zip(frame["symbol"], frame["price"], frame["timestamp"])):
+        if speed:
+            delay = offsets[i] / speed - (time.perf_counter() - started)
+            if delay > 0:
+                await asyncio.sleep(delay)
+        elif i % 1000 == 0:
+            await asyncio.sleep(0)
+        yield symbol, float(price), timestamp
+
+
+async def socket_ticks(host, port):
+    """
+    Reads ticks from a TCP socket, one "SYMBOL,price[,timestamp]" line per
+    tick, until the connection closes. Malformed lines are skipped.
+    """
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        async for line in reader:
+            parts = line.decode(errors="replace").strip().split(",")
+            try:
+                price = float(parts[1])
+            except (IndexError, ValueError):
+                continue
+            timestamp = parts[2] if len(parts) > 2 else datetime.datetime.now().isoformat(timespec="milliseconds")
+            yield parts[0].strip().upper(), price, timestamp
+    finally:
+        writer.close()
+
+
+class WatchRunningError(Exception):
+    """
+    Raised when a watch is started while the server's watch is running.
+    """
+
+
+class AlertService:
+    """
+    Runs a LevelWatcher on a background thread with its own event loop, for
+    the whole Streamlit server, and keeps the most recent alerts for pages to
+    poll. The watched levels are reloaded whenever the plan store changes.
+    """
+
+    def __init__(self, store, max_alerts=1000, refresh_seconds=2.0):
+        self.store = store
+        self.refresh_seconds = refresh_seconds
+        self.alerts = collections.deque(maxlen=max_alerts)
+        self.sequence = 0
+        self.source = None
+        self.trade_date = None
+        self.started_by = None
+        self.error = None
+        self.watcher = None
+        self._lock = threading.Lock()
+        self._loop = None
+        self._task = None
+        self._thread = None
+        self._started = threading.Event()
+        self._control = threading.Lock()
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, source, description, trade_date, approach_pct=APPROACH_PCT, started_by=None):
+        """
+        Starts watching `source()` (an async iterable of ticks) against the
+        levels of the plans for `trade_date`. Every session shares the watch,
+        so a running one is never replaced: raises WatchRunningError until it
+        is stopped.
+        """
+        with self._control:
+            if self.running:
+                raise WatchRunningError(f"{self.started_by} is already watching {self.source} for {self.trade_date}.")
+            self.source, self.trade_date, self.started_by, self.error = description, trade_date, started_by, None
+            self._started.clear()
+            self._thread = threading.Thread(
+                target=asyncio.run, args=(self._watch(source, trade_date, approach_pct),), daemon=True, name="level-alerts",
+            )
+            self._thread.start()
+
+    def stop(self):
+        with self._control:
+            if self.running and self._started.wait(timeout=5):
+                self._loop.call_soon_threadsafe(self._task.cancel)
+                self._thread.join(timeout=5)
+            self._thread = None
+
+    def _publish(self, alerts):
+        with self._lock:
+            for alert in alerts:
+                self.sequence += 1
+                self.alerts.append((self.sequence, alert))
+
+    def alerts_since(self, sequence, owner=None):
+        """
+        Returns (latest sequence number, alerts after `sequence` for `owner`).
+        """
+        with self._lock:
+            alerts = [alert for number, alert in self.alerts if number > sequence and owner in (None, alert.owner)]
+            return self.sequence, alerts
+
+    async def _watch(self, source, trade_date, approach_pct):
+        self._loop, self._task = asyncio.get_running_loop(), asyncio.current_task()
+        self._started.set()
+        refresher = None
+        try:
+            signature = self.store.signature()
+            self.watcher = LevelWatcher(await asyncio.to_thread(load_levels, self.store, trade_date), self._publish, approach_pct)
+
+            async def refresh():
+                nonlocal signature
+                while True:
+                    await asyncio.sleep(self.refresh_seconds)
+                    if self.store.signature() != signature:
+                        signature = self.store.signature()
+                        self.watcher.set_levels(await asyncio.to_thread(load_levels, self.store, trade_date))
+
+            refresher = asyncio.create_task(refresh())
+            await self.watcher.run(source())
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            self.error = str(e)
+        finally:
+            if refresher is not None:
+                refresher.cancel()
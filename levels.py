@@ -0,0 +1,131 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from instrumentation import timed_io
+
+PIVOT_METHODS = ["Classic", "Fibonacci", "Camarilla"]
+
+# Form field key -> level name, for filling Section II from a computed row
+FORM_FIELDS = {
+    "resistance_2": "r2",
+    "resistance_1": "r1",
+    "pivot_point": "pivot",
+    "support_1": "s1",
+    "support_2": "s2",
+}
+
+REQUIRED_COLUMNS = ["symbol", "date", "high", "low", "close"]
+
+
+def load_daily_bars(path):
+    """
+    Reads a daily OHLC file (CSV or Parquet) with one row per symbol and date.
+    """
+    with timed_io("levels.load_daily_bars") as io:
+        if str(path).lower().endswith((".parquet", ".pq")):
+            bars = pd.read_parquet(path)
+        else:
+            bars = pd.read_csv(path)
+        io["bytes_read"] = os.path.getsize(path)
+
+    bars.columns = [str(column).strip().lower() for column in bars.columns]
+    missing = [column for column in REQUIRED_COLUMNS if column not in bars.columns]
+    if missing:
+        raise ValueError(f"Daily OHLC file is missing columns: {', '.join(missing)}")
+
+    bars["symbol"] = bars["symbol"].astype(str).str.strip().str.upper().astype("category")
+    bars["date"] = pd.to_datetime(bars["date"]).dt.normalize()
+    for column in ["high", "low", "close"]:
+        bars[column] = bars[column].astype(np.float64)
+    return bars
+
+
+def _previous_period_range(bars, period_start, current_start):
+    """
+    Returns the high and low of each symbol's last complete period before
+    current_start (e.g. the prior week), indexed by symbol.
+    """
+    mask = (period_start < current_start).to_numpy()
+    prior = bars.loc[mask, ["symbol", "high", "low"]]
+    period = period_start[mask]
+    latest = period.groupby(prior["symbol"], observed=True, sort=False).transform("max")
+    prior = prior[(period == latest).to_numpy()]
+    return prior.groupby("symbol", observed=True).agg(high=("high", "max"), low=("low", "min"))
+
+
+def compute_levels(bars, as_of=None):
+    """
+    Computes the key levels of every symbol in a daily OHLC frame in one
+    vectorized pass. No Python loop runs per symbol.
+
+    The prior day is each symbol's latest bar. The prior week and month are
+    the last complete calendar week and month before `as_of`. By default
+    `as_of` is the business day after the latest date in the file.
+
+    Returns a frame indexed by symbol with the prior day/week/month ranges and
+    the classic, Fibonacci and Camarilla pivots (e.g. `classic_r1`).
+    """
+    bars = bars.sort_values(["symbol", "date"], kind="stable")
+    if as_of is None:
+        as_of = bars["date"].max() + pd.offsets.BDay(1)
+    as_of = pd.Timestamp(as_of).normalize()
+
+    prior_day = bars.drop_duplicates("symbol", keep="last").set_index("symbol")
+    high = prior_day["high"].to_numpy()
+    low = prior_day["low"].to_numpy()
+    close = prior_day["close"].to_numpy()
+    span = high - low
+    pivot = (high + low + close) / 3
+
+    levels = {
+        "prev_date": prior_day["date"],
+        "prev_high": high,
+        "prev_low": low,
+        "prev_close": close,
+        "classic_pivot": pivot,
+        "classic_r1": 2 * pivot - low,
+        "classic_r2": pivot + span,
+        "classic_s1": 2 * pivot - high,
+        "classic_s2": pivot - span,
+        "fibonacci_pivot": pivot,
+        "fibonacci_r1": pivot + 0.382 * span,
+        "fibonacci_r2": pivot + 0.618 * span,
+        "fibonacci_s1": pivot - 0.382 * span,
+        "fibonacci_s2": pivot - 0.618 * span,
+        "camarilla_pivot": pivot,
+    }
+    for n, factor in enumerate([12, 6, 4, 2], start=1):
+        levels[f"camarilla_r{n}"] = close + span * 1.1 / factor
+        levels[f"camarilla_s{n}"] = close - span * 1.1 / factor
+    result = pd.DataFrame(levels, index=prior_day.index)
+
+    dates = bars["date"]
+    week_start = dates - pd.to_timedelta(dates.dt.dayofweek, unit="D")
+    month_start = pd.Series(dates.to_numpy().astype("datetime64[M]").astype("datetime64[ns]"), index=dates.index)
+    as_of_week = as_of - pd.Timedelta(days=as_of.dayofweek)
+    as_of_month = as_of.to_period("M").to_timestamp()
+
+    week = _previous_period_range(bars, week_start, as_of_week)
+    month = _previous_period_range(bars, month_start, as_of_month)
+    result["prev_week_high"] = week["high"]
+    result["prev_week_low"] = week["low"]
+    result["prev_month_high"] = month["high"]
+    result["prev_month_low"] = month["low"]
+    return result
+
+
+def key_level_values(levels, symbol, method="Classic"):
+    """
+    Returns the Section II form values (field key -> price) for one symbol,
+    or None if the symbol has no levels.
+    """
+    symbol = (symbol or "").strip().upper()
+    if symbol not in levels.index:
+        return None
+    row = levels.loc[symbol]
+    prefix = method.lower()
+    values = {key: round(float(row[f"{prefix}_{name}"]), 2) for key, name in FORM_FIELDS.items()}
+    values["previous_day_close"] = round(float(row["prev_close"]), 2)
+    return values
@@ -0,0 +1,57 @@
+import contextlib
+import pickle
+import time
+
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+from instrumentation import record
+
+
+def widget_count():
+    """
+    Returns the number of widgets registered so far in this script run (None outside a run).
+    """
+    ctx = get_script_run_ctx()
+    return len(ctx.widget_ids_this_run) if ctx is not None else None
+
+
+def session_state_bytes():
+    """
+    Returns the approximate size of this session's st.session_state, pickled value by value.
+    """
+    size = 0
+    for key, value in st.session_state.to_dict().items():
+        try:
+            size += len(pickle.dumps(value))
+        except Exception:
+            size += len(repr(value))
+        size += len(str(key))
+    return size
+
+
+@contextlib.contextmanager
+def profile_page(name):
+    """
+    Times a whole page run, with the number of widgets it rendered and the session state size at its end.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record("page", name, (time.perf_counter() - start) * 1000, widgets=widget_count(), state_bytes=session_state_bytes())
+
+
+@contextlib.contextmanager
+def profile_section(name):
+    """
+    Times one section of a page, with the number of widgets it rendered.
+    """
+    widgets = widget_count()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        wall_ms = (time.perf_counter() - start) * 1000
+        after = widget_count()
+        record("section", name, wall_ms, widgets=after - widgets if after is not None and widgets is not None else None)
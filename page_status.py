@@ -0,0 +1,10 @@
+import streamlit as st
+
+def show_status(key):
+    """
+    Shows the status a callback left in st.session_state[key], if any: a
+    (kind, message) pair where kind is "success", "info", "warning" or "error".
+    """
+    if key in st.session_state:
+        kind, message = st.session_state[key]
+        getattr(st, kind)(message)
@@ -1,27 +1,187 @@
+import math
+
 import streamlit as st
-import pandas as pd
+
+from page_profiler import profile_page
+from plan_schema import FIELDS, FIELDS_BY_KEY, FIELDS_BY_SECTION, SECTIONS
+from plan_store import SEARCH_WINDOW, PlanStore
+from trader_session import current_store
+
+PAGE_SIZES = [25, 50, 100, 250]
+SEARCH_LIMIT = 50
+
+# Cached loaders take the store signature (file mtimes and sizes) as their
+# first argument, so every save invalidates them without any explicit
+# bookkeeping, and the trader namespace as their second.
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def load_tickers(signature, owner):
+    return PlanStore(signature[0], owner).tickers()
+
+@st.cache_data(max_entries=256, show_spinner=False)
+def load_count(signature, owner, ticker, trade_date):
+    return PlanStore(signature[0], owner).count(ticker=ticker, trade_date=trade_date)
+
+@st.cache_data(max_entries=256, show_spinner=False)
+def load_page(signature, owner, ticker, trade_date, limit, offset):
+    return PlanStore(signature[0], owner).find(ticker=ticker, trade_date=trade_date, limit=limit, offset=offset)
+
+@st.cache_data(max_entries=256, show_spinner=False)
+def load_plan(signature, owner, plan_id):
+    return PlanStore(signature[0], owner).get(plan_id)
+
+@st.cache_data(max_entries=256, show_spinner=False)
+def load_search(signature, owner, query, ticker, start_date, end_date, bias, direction):
+    """
+    Returns (the best SEARCH_LIMIT hits, the number of matching plans up to SEARCH_WINDOW + 1).
+    """
+    store = PlanStore(signature[0], owner)
+    filters = {"ticker": ticker, "start_date": start_date, "end_date": end_date, "bias": bias, "direction": direction}
+    return store.search(query, limit=SEARCH_LIMIT, **filters), store.count_matches(query, **filters)
+
+def is_empty(value):
+    """
+    Returns True for values the form leaves behind when a field was never filled in.
+    """
+    if value is None or value in ("", "None"):
+        return True
+    if isinstance(value, bool):
+        return False
+    if isinstance(value, float) and math.isnan(value):
+        return True
+    return isinstance(value, (int, float)) and value == 0
+
+def format_value(value):
+    if isinstance(value, float):
+        return f"{value:,.2f}"
+    # Keep line breaks in narrative text
+    return str(value).strip().replace("\n", "  \n")
+
+def format_fields(columns, data):
+    """
+    Returns the non-empty columns of a plan as a single markdown string.
+    """
+    lines = []
+    for column in columns:
+        value = data.get(column)
+        if is_empty(value):
+            continue
+        if isinstance(value, bool):
+            lines.append(f"- {'✅' if value else '⬜'} {column}")
+        else:
+            lines.append(f"- **{column}:** {format_value(value)}")
+    return "\n".join(lines)
+
+def render_plan(plan):
+    """
+    Renders a stored plan with one markdown element per section, skipping empty fields.
+    """
+    st.subheader(f"#{plan.plan_id} {plan.ticker} — {plan.trade_date}")
+    st.caption(f"Saved {plan.created_at}")
+
+    sections = {section: [field.column for field in FIELDS_BY_SECTION[section]] for section in SECTIONS}
+    known = {field.column for field in FIELDS}
+    sections["Other"] = [column for column in plan.data if column not in known]
+    for section, columns in sections.items():
+        body = format_fields(columns, plan.data)
+        if body:
+            st.markdown(f"#### {section}\n{body}")
+
+def select_plan_id(store):
+    """
+    Lets the user browse the plan store page by page, search it, or jump to a
+    plan number, and returns the selected plan id (or None).
+    """
+    signature = store.signature()
+    st.sidebar.header("Find a Trading Plan")
+    lookup = st.sidebar.radio("Look up by", ["Browse", "Search", "Plan #"], key="plan_lookup", horizontal=True)
+    if lookup == "Plan #":
+        return st.sidebar.number_input("Plan #", min_value=1, step=1, key="lookup_plan_id")
+    if lookup == "Search":
+        return search_plan_id(store)
+
+    ticker = st.sidebar.selectbox("Ticker", ["All tickers", *load_tickers(signature, store.owner)], key="lookup_ticker")
+    ticker = None if ticker == "All tickers" else ticker
+    trade_date = None
+    if st.sidebar.checkbox("Filter by trade date", key="lookup_by_date"):
+        trade_date = st.sidebar.date_input("Trade Date", key="lookup_trade_date").isoformat()
+    page_size = st.sidebar.selectbox("Plans per page", PAGE_SIZES, key="lookup_page_size")
+
+    total = load_count(signature, store.owner, ticker, trade_date)
+    pages = max(1, math.ceil(total / page_size))
+    page = st.sidebar.number_input(f"Page (of {pages})", min_value=1, max_value=pages, step=1, key="lookup_page")
+    summaries = load_page(signature, store.owner, ticker, trade_date, page_size, (min(page, pages) - 1) * page_size)
+    st.sidebar.caption(f"{total} matching plans")
+
+    if not summaries:
+        return None
+    labels = {s.plan_id: f"#{s.plan_id} {s.ticker} {s.trade_date} ({s.created_at})" for s in summaries}
+    return st.sidebar.radio("Plan", list(labels), format_func=labels.get, key="lookup_plan")
+
+def search_plan_id(store):
+    """
+    Lets the user search the plans' narrative and scenario text, lists the
+    ranked hits with their highlighted snippets, and returns the selected
+    plan id (or None).
+    """
+    signature = store.signature()
+    query = st.sidebar.text_input("Search", key="search_query", help=(
+        'Words match by stem. Use "quotes" for phrases, a trailing * for prefixes, and OR / NOT. '
+        f"Matches are ranked by relevance; when more than {SEARCH_WINDOW:,} plans match, only the {SEARCH_WINDOW:,} most recent are ranked."
+    ))
+    ticker = st.sidebar.selectbox("Ticker", ["All tickers", *load_tickers(signature, store.owner)], key="search_ticker")
+    start_date = end_date = None
+    if st.sidebar.checkbox("Filter by trade date", key="search_by_date"):
+        start_date = st.sidebar.date_input("From", key="search_from").isoformat()
+        end_date = st.sidebar.date_input("To", key="search_to").isoformat()
+    bias = st.sidebar.selectbox("Overall Bias", ["Any", *FIELDS_BY_KEY["overall_bias"].options], key="search_bias")
+    direction = st.sidebar.selectbox("Trade Direction", ["Any", *FIELDS_BY_KEY["trade_direction"].options], key="search_direction")
+
+    if not query.strip():
+        return None
+    hits, matches = load_search(
+        signature, store.owner, query.strip(), None if ticker == "All tickers" else ticker, start_date, end_date,
+        None if bias == "Any" else bias, None if direction == "Any" else direction,
+    )
+    if matches > SEARCH_WINDOW:
+        st.sidebar.caption(f"More than {SEARCH_WINDOW:,} matching plans: showing the best matches among the {SEARCH_WINDOW:,} most recent. Narrow the search to rank older plans.")
+    else:
+        st.sidebar.caption(f"{matches:,} matching plans" + (" (best matches shown)" if matches > len(hits) else ""))
+    if not hits:
+        return None
+
+    lines = []
+    for hit in hits:
+        snippet = hit.snippet.replace("\n", " · ")
+        lines.append(f"- **#{hit.plan_id} {hit.ticker} {hit.trade_date}** — {snippet}")
+    with st.expander(f"Search results for “{query.strip()}”", expanded=True):
+        st.markdown("\n".join(lines))
+    labels = {hit.plan_id: f"#{hit.plan_id} {hit.ticker} {hit.trade_date}" for hit in hits}
+    return st.sidebar.radio("Plan", list(labels), format_func=labels.get, key="search_plan")
 
 def display_trading_plan():
     """
-    Reads the trading_plan.csv file and displays its contents in a Streamlit app.
+    Loads the selected plan from the plan store and displays its contents in a Streamlit app.
     """
     st.header("Trading Plan Details")
 
     try:
-        df = pd.read_csv("trading_plan.csv")
-
-        # Display the DataFrame in a more readable format
-        for col in df.columns:
-            st.subheader(col)
-            st.write(df[col].iloc[0])  # Display the first row's value for each column
-            st.markdown("---")  # Add a separator between columns
-
-    except FileNotFoundError:
-        st.error("Trading plan file not found. Please save a trading plan first.")
-    except pd.errors.EmptyDataError:
-        st.warning("The trading plan file is empty.")
+        store = current_store()
+        plan_id = select_plan_id(store)
+        if plan_id is None:
+            st.info("No trading plans match this lookup. Save a trading plan first, or enter a search.")
+            return
+
+        plan = load_plan(store.signature(), store.owner, int(plan_id))
+        if plan is None:
+            st.warning(f"Trading plan #{plan_id} was not found.")
+            return
+
+        render_plan(plan)
+
     except Exception as e:
         st.error(f"An error occurred: {e}")
 
 if __name__ == "__main__":
-    display_trading_plan()
\ No newline at end of file
+    with profile_page("View Trade Plans"):
+        display_trading_plan()
@@ -0,0 +1,57 @@
+import datetime
+
+import streamlit as st
+
+from page_profiler import profile_page
+from scenario_backtest import run_backtest
+from trader_session import current_store
+
+def scenario_backtest():
+    """
+    Replays stored plans' What If rules against historical 1-minute bars and
+    shows how often each scenario fired and what its THEN Action returned.
+    """
+    st.header("Scenario Backtest")
+    store = current_store()
+    st.caption(
+        "Only scenarios with an IF Rule are replayed. A scenario fires on the first bar where its rule holds; "
+        "its THEN Action is entered at that bar's close and held to the session close."
+    )
+
+    bars_path = st.text_input("1-Minute bar file (Parquet or Arrow)", placeholder="e.g., data/minute.parquet", key="backtest_path")
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        start_date = st.date_input("From", value=datetime.date.today() - datetime.timedelta(days=365), key="backtest_start")
+    with col2:
+        end_date = st.date_input("To", key="backtest_end")
+    with col3:
+        workers = st.number_input("Worker processes (0 = one per CPU)", min_value=0, value=0, step=1, key="backtest_workers")
+
+    if not st.button("Run Backtest", disabled=not bars_path.strip()):
+        return
+
+    try:
+        with st.spinner("Replaying plans..."):
+            results, summary, errors = run_backtest(store, bars_path.strip(), start_date, end_date, workers or None)
+    except Exception as e:
+        st.error(f"An error occurred: {e}")
+        return
+
+    for error in errors:
+        st.warning(error)
+    if results.empty:
+        st.info("No plans with IF Rules were found for this period.")
+        return
+
+    st.subheader("By Scenario")
+    st.dataframe(summary, hide_index=True, use_container_width=True, column_config={
+        "fire_rate": st.column_config.NumberColumn("fire rate", format="percent"),
+        "avg_return_pct": st.column_config.NumberColumn("avg return %", format="%.2f"),
+        "win_rate": st.column_config.NumberColumn("win rate", format="percent"),
+    })
+    st.subheader("By Plan")
+    st.dataframe(results, hide_index=True, use_container_width=True)
+
+if __name__ == "__main__":
+    with profile_page("Scenario Backtest"):
+        scenario_backtest()
@@ -0,0 +1,51 @@
+import streamlit as st
+
+from page_profiler import profile_page
+from plan_store import PlanStore
+from risk import load_day_risk
+from trader_session import current_store
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def day_risk_summary(signature, owner, trade_date):
+    return load_day_risk(PlanStore(signature[0], owner), trade_date)
+
+def show_day_risk(trade_date):
+    """
+    Shows the at-risk capital, sector exposure and loss-limit breaches of every plan saved for a day.
+    """
+    store = current_store()
+    plans, sectors, limit = day_risk_summary(store.signature(), store.owner, trade_date)
+    if plans.empty:
+        st.info(f"No trading plans saved for {trade_date}.")
+        return
+
+    total = plans["at_risk"].sum()
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Plans", len(plans))
+    col2.metric("Total At Risk", f"{total:,.2f}")
+    col3.metric("Maximum Daily Loss", "—" if limit != limit else f"{limit:,.2f}")
+
+    breaches = plans[plans["breaches_own_limit"] | plans["breaches_daily_limit"]]
+    if not breaches.empty:
+        st.error("Plans breaching the Maximum Daily Loss: " + ", ".join(f"#{p} {t}" for p, t in zip(breaches["plan_id"], breaches["ticker"])))
+    invalid = plans[~plans["valid"]]
+    if not invalid.empty:
+        st.warning("Plans whose Target/Stop-Loss could not be turned into a valid risk: " + ", ".join(f"#{p} {t}" for p, t in zip(invalid["plan_id"], invalid["ticker"])))
+
+    st.dataframe(plans, hide_index=True, use_container_width=True, column_config={
+        "r_multiple": st.column_config.NumberColumn("R-multiple", format="%.2f"),
+    })
+    st.subheader("Sector Exposure")
+    st.dataframe(sectors, use_container_width=True)
+
+def risk_overview():
+    """
+    Aggregates the risk of all plans saved for a trade date.
+    """
+    st.header("Risk Overview")
+    trade_date = st.date_input("Trade Date", key="risk_trade_date")
+    show_day_risk(trade_date.isoformat())
+
+if __name__ == "__main__":
+    with profile_page("Risk Overview"):
+        risk_overview()
@@ -0,0 +1,126 @@
+import dataclasses
+import functools
+
+import pandas as pd
+import streamlit as st
+
+from level_alerts import APPROACH_PCT, AlertService, WatchRunningError, replay_ticks, socket_ticks
+from page_profiler import profile_page
+from page_status import show_status
+from plan_store import PlanStore
+from trader_session import current_store
+
+ALERT_ICONS = {"approach": "👀", "enter": "🎯", "break": "🚀", "blow_through": "💥", "cross": "↕️"}
+RECENT_ALERTS = 200
+
+@st.cache_resource
+def alert_service(path):
+    """
+    The level watcher of this server for a store file, shared by every session.
+    """
+    return AlertService(PlanStore(path))
+
+def start_watching(service, owner):
+    state = st.session_state
+    if state["alert_source"] == "Replay file":
+        path = state["alert_path"].strip()
+        if not path:
+            state["alert_status"] = ("warning", "Enter a tick or bar file to replay.")
+            return
+        source = functools.partial(replay_ticks, path, state["alert_speed"] or None)
+        description = f"replay of {path}"
+    else:
+        host, port = state["alert_host"].strip(), int(state["alert_port"])
+        source = functools.partial(socket_ticks, host, port)
+        description = f"ticks from {host}:{port}"
+    try:
+        service.start(source, description, state["alert_date"].isoformat(), state["alert_approach"], owner)
+    except WatchRunningError as e:
+        state["alert_status"] = ("warning", str(e))
+        return
+    state["alert_status"] = ("success", f"Watching {description}.")
+
+def stop_watching(service, owner):
+    if service.started_by != owner:
+        st.session_state["alert_status"] = ("warning", f"Only {service.started_by} can stop the watch they started.")
+        return
+    service.stop()
+    st.session_state["alert_status"] = ("info", "Stopped watching.")
+
+def watcher_sidebar(service, owner):
+    """
+    Sidebar controls for the tick source and the plans being watched. The
+    watch is shared by the whole server: while it runs, its settings are
+    shown read-only and only the trader who started it can stop it.
+    """
+    st.sidebar.header("Tick Stream")
+    if service.running:
+        st.sidebar.markdown(f"Watching {service.source} for the plans of {service.trade_date}, started by **{service.started_by}**.")
+        st.sidebar.button(
+            "Stop", on_click=stop_watching, args=(service, owner), disabled=service.started_by != owner,
+            help="Stops the watch for every trader on this server.",
+        )
+        return
+    source = st.sidebar.radio("Source", ["Replay file", "Socket"], key="alert_source", horizontal=True)
+    if source == "Replay file":
+        st.sidebar.text_input("Tick or 1-second bar file (CSV, Parquet or Arrow)", placeholder="e.g., data/ticks.parquet", key="alert_path")
+        st.sidebar.number_input("Replay speed (x real time, 0 = as fast as possible)", min_value=0.0, value=1.0, key="alert_speed")
+    else:
+        st.sidebar.text_input("Host", value="127.0.0.1", key="alert_host")
+        st.sidebar.number_input("Port", min_value=1, max_value=65535, value=9999, key="alert_port")
+    st.sidebar.date_input("Watch plans for", key="alert_date")
+    st.sidebar.number_input("Approach alert within (%)", min_value=0.0, value=APPROACH_PCT, step=0.05, format="%.2f", key="alert_approach")
+    st.sidebar.button("Start", on_click=start_watching, args=(service, owner), help="Starts the watch for every trader on this server.")
+
+@st.fragment(run_every=1)
+def show_alerts(service, owner):
+    """
+    Polls the watcher for this trader's new alerts, pops them up as toasts
+    and lists the most recent ones.
+    """
+    sequence, alerts = service.alerts_since(st.session_state.get("alerts_seen", 0), owner)
+    st.session_state["alerts_seen"] = sequence
+    for alert in alerts[-5:]:
+        st.toast(f"**{alert.symbol}** {alert.message} @ {alert.price:,.2f}", icon=ALERT_ICONS.get(alert.kind))
+    recent = st.session_state.setdefault("recent_alerts", [])
+    recent[:0] = [dataclasses.asdict(alert) for alert in reversed(alerts)]
+    del recent[RECENT_ALERTS:]
+
+    watcher = service.watcher
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Status", "Watching" if service.running else "Stopped")
+    col2.metric("Levels", f"{watcher.index.size:,}" if watcher else "—")
+    col3.metric("Ticks", f"{watcher.stats.ticks:,}" if watcher else "—")
+    col4.metric("Max latency", f"{watcher.stats.max_latency_ms:,.1f} ms" if watcher else "—")
+    if service.source:
+        st.caption(f"Source: {service.source}")
+    if service.error:
+        st.error(f"The watcher stopped: {service.error}")
+
+    if recent:
+        st.dataframe(
+            pd.DataFrame(recent, columns=["timestamp", "symbol", "price", "plan_id", "level", "kind", "message"]),
+            hide_index=True, use_container_width=True,
+        )
+    else:
+        st.info("No alerts yet.")
+
+def level_alerts():
+    """
+    Watches a live (or replayed) tick stream against the levels of the day's
+    saved plans and shows crossing and approach alerts as they happen.
+    """
+    st.header("Level Alerts")
+    store = current_store()
+    service = alert_service(store.path)
+    st.caption(
+        "One watcher runs for the whole server and checks every trader's plans; you see the alerts for your plans. "
+        "Levels are reloaded when plans are saved."
+    )
+    watcher_sidebar(service, store.owner)
+    show_status("alert_status")
+    show_alerts(service, store.owner)
+
+if __name__ == "__main__":
+    with profile_page("Level Alerts"):
+        level_alerts()
@@ -0,0 +1,65 @@
+import os
+
+import pandas as pd
+import streamlit as st
+
+from instrumentation import METRICS_FILE_ENV, RING_SIZE, clear, export, summarize, timings
+from page_profiler import session_state_bytes
+from page_status import show_status
+
+EXPORT_FILE = "trade_planner_metrics.jsonl"
+RECENT_TIMINGS = 200
+TABLES = {
+    "page": ("Page Runs", ["name", "count", "p50_ms", "p99_ms", "max_ms", "widgets", "state_bytes"]),
+    "section": ("Planner Sections", ["name", "count", "p50_ms", "p99_ms", "max_ms", "widgets"]),
+    "io": ("Storage I/O", ["name", "count", "p50_ms", "p99_ms", "max_ms", "bytes_read", "bytes_written"]),
+}
+
+def clear_timings():
+    clear()
+    st.session_state["diagnostics_status"] = ("info", "Cleared the recorded timings.")
+
+def diagnostics_sidebar(recorded):
+    st.sidebar.header("Timings")
+    st.sidebar.button("Clear", on_click=clear_timings)
+    st.sidebar.download_button(
+        "Export", data=export(recorded), file_name=EXPORT_FILE, mime="application/x-ndjson",
+        on_click="ignore", disabled=not recorded, help="Downloads the recorded timings as a JSON-lines file.",
+    )
+    path = os.environ.get(METRICS_FILE_ENV)
+    st.sidebar.caption(f"Every timing is also appended to {path}." if path else f"Set {METRICS_FILE_ENV} to append every timing to a file.")
+
+def diagnostics():
+    """
+    Shows the p50/p99 wall time of page runs, planner sections and storage
+    calls recorded by this server, with widget counts, session state size and
+    bytes read or written.
+    """
+    st.header("Diagnostics")
+    recorded = timings()
+    diagnostics_sidebar(recorded)
+    show_status("diagnostics_status")
+
+    st.caption(f"The last {RING_SIZE:,} timings of every session on this server are kept in memory; this session's state is {session_state_bytes():,} bytes.")
+    if not recorded:
+        st.info("No timings recorded yet. Open the other pages to collect some.")
+        return
+
+    summary = summarize(recorded)
+    for kind, (title, columns) in TABLES.items():
+        st.subheader(title)
+        rows = summary[summary["kind"] == kind]
+        if rows.empty:
+            st.info(f"No {title.lower()} recorded yet.")
+            continue
+        st.dataframe(rows[columns], hide_index=True, use_container_width=True, column_config={
+            column: st.column_config.NumberColumn(format="%.1f") for column in ["p50_ms", "p99_ms", "max_ms", "widgets"]
+        })
+
+    with st.expander("Recent Timings"):
+        recent = pd.DataFrame(recorded[-RECENT_TIMINGS:][::-1])
+        recent["time"] = pd.to_datetime(recent["time"], unit="s")
+        st.dataframe(recent, hide_index=True, use_container_width=True)
+
+if __name__ == "__main__":
+    diagnostics()
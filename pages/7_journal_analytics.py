@@ -0,0 +1,111 @@
+import datetime
+
+import pandas as pd
+import streamlit as st
+
+from page_profiler import profile_page
+from plan_rollups import CHECKLISTS, DAY, ROLLUP_COLUMNS, WEEK, adherence, breakdown, dimension_stats, streaks, week_start
+from plan_store import PlanStore
+from trader_session import current_store
+
+PERIODS = {"Daily": DAY, "Weekly": WEEK}
+
+# Cached per week and keyed by the week's rollup version instead of the store
+# signature, so a save only invalidates the week it touched.
+@st.cache_data(max_entries=2048, show_spinner=False)
+def load_week(path, owner, week, version):
+    return PlanStore(path, owner).rollups(week)
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def load_summary(path, owner, end_date, versions, period):
+    """
+    Computes the page's tables from the rollups of the given (week, version)
+    pairs. After a save only the saved week is read again from the store.
+    """
+    rollups = pd.concat([load_week(path, owner, week, version) for week, version in versions], ignore_index=True)
+    # The last week may run past the end date: its days are cut off there and
+    # its week rows rebuilt from the days kept, so every table counts the same plans
+    last_week = week_start(end_date).isoformat()
+    days = rollups[(rollups["period"] == DAY) & (rollups["period_start"] <= end_date.isoformat())]
+    partial = days[days["period_start"] >= last_week].groupby(["dimension", "value", "metric"], as_index=False)["count"].sum()
+    partial = partial.assign(period=WEEK, period_start=last_week)
+    weeks = rollups[(rollups["period"] == WEEK) & (rollups["period_start"] != last_week)]
+    rollups = pd.concat([weeks, partial, days], ignore_index=True)[ROLLUP_COLUMNS]
+    runs, streak_summary = streaks(rollups)
+    return {
+        "totals": rollups[(rollups["period"] == WEEK) & (rollups["dimension"] == "all")].groupby("metric")["count"].sum(),
+        "adherence": adherence(rollups, period) * 100,
+        "bias": breakdown(rollups, period, "bias"),
+        "direction": breakdown(rollups, period, "direction"),
+        "sector": dimension_stats(rollups, "sector"),
+        "scenario": dimension_stats(rollups, "scenario"),
+        "streaks": runs,
+        "streak_summary": streak_summary,
+    }
+
+def percent_columns(frame):
+    return {column: st.column_config.NumberColumn(format="%.0f%%") for column in frame.columns if column != "Plans"}
+
+def show_adherence(rates):
+    st.subheader("Checklist Adherence")
+    st.line_chart(rates[[f"{name} complete" for name in CHECKLISTS]], y_label="% of plans")
+    with st.expander("Per checklist item"):
+        st.dataframe(rates.sort_index(ascending=False), use_container_width=True, column_config=percent_columns(rates))
+
+def show_breakdowns(bias, direction):
+    st.subheader("Bias and Direction")
+    col1, col2 = st.columns(2)
+    col1.bar_chart(bias, y_label="Plans by Overall Bias")
+    col2.bar_chart(direction, y_label="Plans by Trade Direction")
+
+def show_dimension(stats, dimension, title):
+    st.subheader(title)
+    if stats.empty:
+        st.info(f"No plans with a {dimension} in this range.")
+        return
+    stats = stats.copy()
+    stats.iloc[:, 1:] *= 100
+    st.dataframe(stats, use_container_width=True, column_config=percent_columns(stats))
+
+def show_streaks(runs, summary):
+    st.subheader("Streaks")
+    st.caption("Consecutive planned days on which every plan completed the checklist (within the selected range).")
+    col1, col2 = st.columns([1, 2])
+    col1.dataframe(summary, use_container_width=True)
+    col2.line_chart(runs, y_label="Streak (days)")
+
+def journal_analytics():
+    """
+    Checklist adherence, bias and direction breakdowns, per-sector and
+    per-scenario statistics and streaks over the trader's journal, read from
+    the daily and weekly rollups kept by the store.
+    """
+    st.header("Journal Analytics")
+    store = current_store()
+    end_date = st.sidebar.date_input("Through", key="analytics_end")
+    weeks = st.sidebar.slider("Weeks", min_value=4, max_value=104, value=26, key="analytics_weeks")
+    period = PERIODS[st.sidebar.radio("Period", list(PERIODS), index=1, key="analytics_period", horizontal=True)]
+    start_date = week_start(end_date) - datetime.timedelta(weeks=weeks - 1)
+
+    versions = tuple(store.rollup_versions(start_date, end_date).items())
+    summary = load_summary(store.path, store.owner, end_date, versions, period) if versions else None
+    if summary is None or not summary["totals"].get("plans"):
+        st.info(f"No trading plans saved between {start_date} and {end_date}.")
+        return
+
+    totals = summary["totals"]
+    plans = totals["plans"]
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Plans", f"{plans:,}")
+    for column, name in zip([col2, col3, col4], CHECKLISTS):
+        column.metric(f"{name} checklist complete", f"{totals.get(f'{name} complete', 0) / plans:.0%}")
+
+    show_adherence(summary["adherence"])
+    show_breakdowns(summary["bias"], summary["direction"])
+    show_dimension(summary["sector"], "sector", "By Sector")
+    show_dimension(summary["scenario"], "scenario", "By Scenario")
+    show_streaks(summary["streaks"], summary["streak_summary"])
+
+if __name__ == "__main__":
+    with profile_page("Journal Analytics"):
+        journal_analytics()
@@ -0,0 +1,208 @@
+import collections
+import datetime
+import json
+
+import pandas as pd
+
+from plan_schema import FIELDS, FIELDS_BY_KEY, SCENARIOS
+
+DAY = "day"
+WEEK = "week"
+PLANS = "plans"
+# Checklist -> its checkbox keys. A plan "completes" a checklist when every box is ticked.
+CHECKLISTS = {
+    "Pre-market": ["check_news", "review_overnight", "identify_gaps", "analyze_volume_checkbox"],
+    "Risk": ["check_position_size", "ensure_stop_loss", "evaluate_risk_reward", "consider_correlated_trades"],
+    "Review": ["check_entry_plan", "check_stop_loss", "check_target", "check_emotions", "check_lessons"],
+}
+CHECKBOXES = [field.key for field in FIELDS if field.kind == "checkbox"]
+# Besides the "all" totals, plans are broken down by bias, direction, sector
+# and scenario. Breakdowns count plans, completed checklists and targets
+# achieved only; per-box counts are kept for "all".
+BREAKDOWN_METRICS = [PLANS, "check_target", *(f"{name} complete" for name in CHECKLISTS)]
+
+BIAS_COLUMN = FIELDS_BY_KEY["overall_bias"].column
+DIRECTION_COLUMN = FIELDS_BY_KEY["trade_direction"].column
+SECTOR_COLUMN = FIELDS_BY_KEY["sector"].column
+
+# Counts per owner, period (a day, or a week starting on Monday), dimension
+# value and metric, kept up to date by every save. Only non-zero counts are
+# stored. plan_rollup_weeks holds a version per owner and week that changes
+# whenever one of the week's counts does, so readers can cache a week until
+# it changes.
+ROLLUP_SCHEMA = """
+CREATE TABLE IF NOT EXISTS plan_rollups (
+    owner TEXT NOT NULL,
+    period_start TEXT NOT NULL,
+    period TEXT NOT NULL,
+    dimension TEXT NOT NULL,
+    value TEXT NOT NULL,
+    metric TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (owner, period_start, period, dimension, value, metric)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS plan_rollup_weeks (
+    owner TEXT NOT NULL,
+    week_start TEXT NOT NULL,
+    version INTEGER NOT NULL,
+    PRIMARY KEY (owner, week_start)
+) WITHOUT ROWID;
+"""
+
+ROLLUP_COLUMNS = ["period", "period_start", "dimension", "value", "metric", "count"]
+
+
+def week_start(day):
+    """
+    Returns the Monday of the week of a date (or ISO date string).
+    """
+    if isinstance(day, str):
+        day = datetime.date.fromisoformat(day)
+    if isinstance(day, datetime.datetime):
+        day = day.date()
+    return day - datetime.timedelta(days=day.weekday())
+
+
+def scenarios_used(data):
+    """
+    Returns the titles of the reactive scenarios a plan fills in (IF text, rule or action).
+    """
+    return [
+        title for key, title in SCENARIOS.items()
+        if data.get(f"IF - {title}") or data.get(f"RULE - {title}") or data.get(f"ACTION - {title}") in ("Long", "Short")
+    ]
+
+
+def plan_counts(data):
+    """
+    Returns the (dimension, value, metric) counters one plan adds to its day and week.
+    """
+    checked = {key for key in CHECKBOXES if data.get(FIELDS_BY_KEY[key].column)}
+    metrics = [PLANS, *sorted(checked)]
+    metrics += [f"{name} complete" for name, keys in CHECKLISTS.items() if checked.issuperset(keys)]
+    breakdown = [metric for metric in metrics if metric in BREAKDOWN_METRICS]
+
+    values = [
+        ("bias", data.get(BIAS_COLUMN) or "Unset"),
+        ("direction", data.get(DIRECTION_COLUMN) or "Unset"),
+        ("sector", str(data.get(SECTOR_COLUMN) or "").strip() or "Unknown"),
+        *(("scenario", title) for title in scenarios_used(data)),
+    ]
+    counts = [("all", "", metric) for metric in metrics]
+    counts += [(dimension, value, metric) for dimension, value in values for metric in breakdown]
+    return counts
+
+
+def _upsert(conn, owner, counts):
+    # counts: (period_start, period, dimension, value, metric) -> change
+    conn.executemany(
+        "INSERT INTO plan_rollups (owner, period_start, period, dimension, value, metric, count) VALUES (?, ?, ?, ?, ?, ?, ?) "
+        "ON CONFLICT (owner, period_start, period, dimension, value, metric) DO UPDATE SET count = count + excluded.count",
+        [(owner, *key, change) for key, change in counts.items() if change],
+    )
+    conn.executemany(
+        "DELETE FROM plan_rollups WHERE owner = ? AND period_start = ? AND count <= 0",
+        [(owner, start) for start in {key[0] for key, change in counts.items() if change < 0}],
+    )
+    conn.executemany(
+        "INSERT INTO plan_rollup_weeks (owner, week_start, version) VALUES (?, ?, 1) "
+        "ON CONFLICT (owner, week_start) DO UPDATE SET version = version + 1",
+        [(owner, start) for start in {key[0] for key in counts if key[1] == WEEK}],
+    )
+
+
+def _add(counts, trade_date, data, sign):
+    day = datetime.date.fromisoformat(str(trade_date)[:10])
+    for start, period in ((day.isoformat(), DAY), (week_start(day).isoformat(), WEEK)):
+        for counter in plan_counts(data):
+            counts[(start, period, *counter)] += sign
+
+
+def rollup_plan(conn, owner, trade_date, data, previous=None):
+    """
+    Adds a saved plan to its day and week rollups, and removes the plan's
+    previous version (a (trade_date, data) pair) when it was edited. Runs on
+    the caller's connection, inside the transaction that saved the plan.
+    """
+    counts = collections.Counter()
+    if previous is not None:
+        _add(counts, previous[0], previous[1], -1)
+    _add(counts, trade_date, data, 1)
+    _upsert(conn, owner, counts)
+
+
+def rollup_all(conn):
+    """
+    Rebuilds the rollups of every plan in the file. Week versions only ever
+    increase, so nothing cached before the rebuild is reused.
+    """
+    conn.execute("DELETE FROM plan_rollups")
+    conn.execute("UPDATE plan_rollup_weeks SET version = version + 1")
+    owners = collections.defaultdict(collections.Counter)
+    for owner, trade_date, data in conn.execute("SELECT owner, trade_date, data FROM plans"):
+        _add(owners[owner], trade_date, json.loads(data), 1)
+    for owner, counts in owners.items():
+        _upsert(conn, owner, counts)
+
+
+def adherence(rollups, period):
+    """
+    Returns, per period start, the share of plans with each checkbox ticked and
+    each checklist completed.
+    """
+    totals = rollups[(rollups["period"] == period) & (rollups["dimension"] == "all")]
+    counts = totals.pivot_table(index="period_start", columns="metric", values="count", aggfunc="sum", fill_value=0)
+    metrics = [*(f"{name} complete" for name in CHECKLISTS), *CHECKBOXES]
+    counts = counts.reindex(columns=[PLANS, *metrics], fill_value=0)
+    rates = counts[metrics].div(counts[PLANS], axis=0)
+    rates.columns = [metric if metric.endswith(" complete") else FIELDS_BY_KEY[metric].label for metric in metrics]
+    rates.index = pd.to_datetime(rates.index)
+    return rates
+
+
+def breakdown(rollups, period, dimension):
+    """
+    Returns the number of plans per period start (rows) and dimension value (columns).
+    """
+    plans = rollups[(rollups["period"] == period) & (rollups["dimension"] == dimension) & (rollups["metric"] == PLANS)]
+    counts = plans.pivot_table(index="period_start", columns="value", values="count", aggfunc="sum", fill_value=0)
+    counts.index = pd.to_datetime(counts.index)
+    return counts
+
+
+def dimension_stats(rollups, dimension):
+    """
+    Totals the weekly rollups of a dimension per value: plans, and the share of
+    them that completed each checklist or achieved the target.
+    """
+    rows = rollups[(rollups["period"] == WEEK) & (rollups["dimension"] == dimension)]
+    counts = rows.pivot_table(index="value", columns="metric", values="count", aggfunc="sum", fill_value=0)
+    counts = counts.reindex(columns=BREAKDOWN_METRICS, fill_value=0)
+    stats = counts[BREAKDOWN_METRICS[1:]].div(counts[PLANS], axis=0)
+    stats.columns = ["Target achieved", *(f"{name} complete" for name in CHECKLISTS)]
+    stats.insert(0, "Plans", counts[PLANS])
+    return stats.sort_values("Plans", ascending=False).rename_axis(dimension.capitalize())
+
+
+def streaks(rollups):
+    """
+    Returns, per checklist, the run of consecutive planned days on which every
+    plan completed it: a frame of the run length at each planned day, and the
+    current and longest run.
+    """
+    totals = rollups[(rollups["period"] == DAY) & (rollups["dimension"] == "all")]
+    counts = totals.pivot_table(index="period_start", columns="metric", values="count", aggfunc="sum", fill_value=0)
+    counts = counts.reindex(columns=[PLANS, *(f"{name} complete" for name in CHECKLISTS)], fill_value=0)
+    counts = counts[counts[PLANS] > 0]
+
+    runs = pd.DataFrame(index=pd.to_datetime(counts.index))
+    for name in CHECKLISTS:
+        kept = (counts[f"{name} complete"] == counts[PLANS]).to_numpy()
+        # Length of the run of kept days ending at each day: a cumulative count reset by every missed day
+        groups = (~kept).cumsum()
+        runs[name] = pd.Series(kept.astype(int), index=runs.index).groupby(groups).cumsum().to_numpy()
+    summary = pd.DataFrame({
+        "Current streak (days)": runs.iloc[-1] if len(runs) else 0,
+        "Longest streak (days)": runs.max() if len(runs) else 0,
+    }, index=list(CHECKLISTS))
+    return runs, summary
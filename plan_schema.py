@@ -0,0 +1,230 @@
+import datetime
+from collections import namedtuple
+
+# One row per form field. `key` is the widget/session-state key, `column` the
+# name the value is stored under, `label` the widget label and `kind` the
+# widget type ("text", "textarea", "number", "checkbox", "select" or "date").
+# `heading` and `prompt` are rendered above the first field that carries them;
+# consecutive fields sharing a `row` are laid out side by side.
+Field = namedtuple(
+    "Field",
+    ["key", "column", "label", "kind", "section", "heading", "prompt", "placeholder", "options", "row"],
+    defaults=[None, None, None, None, None],
+)
+
+# Bump when FIELDS changes, so stored columnar files record which version of
+# the form wrote them (see plan_format)
+SCHEMA_VERSION = 1
+
+PRE_MARKET = "I. Pre-Market Analysis"
+KEY_LEVELS = "II. Key Levels"
+TRADE_SETUP = "III. Primary Trade Setup"
+WHAT_IFS = "IV. What Ifs (Reactive Scenarios)"
+RISK_MANAGEMENT = "V. Risk Management"
+TRADE_MANAGEMENT = "VI. Trade Management"
+
+SECTIONS = [PRE_MARKET, KEY_LEVELS, TRADE_SETUP, WHAT_IFS, RISK_MANAGEMENT, TRADE_MANAGEMENT]
+
+SCENARIO_ACTIONS = ("None", "Long", "Short")
+RULE_PLACEHOLDER = "Optional, e.g., price > resistance_1 and gap_pct >= 2 and volume_ratio < 0.5"
+
+
+def _scenario(key, title, heading, prompt, if_placeholder, then_placeholder, narrative_key=None, narrative_placeholder=None):
+    """
+    Returns the IF / THEN (/ Narrative Consideration) fields of one reactive
+    scenario, plus its optional structured rule and action (see scenario_backtest).
+    """
+    fields = [
+        Field(f"if_{key}", f"IF - {title}", "IF", "textarea", WHAT_IFS, heading=heading, prompt=prompt, placeholder=if_placeholder),
+        Field(f"then_{key}", f"THEN - {title}", "THEN", "textarea", WHAT_IFS, placeholder=then_placeholder),
+        Field(f"rule_{key}", f"RULE - {title}", "IF Rule", "text", WHAT_IFS, placeholder=RULE_PLACEHOLDER, row=key),
+        Field(f"action_{key}", f"ACTION - {title}", "THEN Action", "select", WHAT_IFS, options=SCENARIO_ACTIONS, row=key),
+    ]
+    if narrative_key:
+        fields.append(Field(narrative_key, f"Narrative Consideration - {title}", "Narrative Consideration", "textarea", WHAT_IFS, placeholder=narrative_placeholder))
+    return fields
+
+
+FIELDS = [
+    # I. Pre-Market Analysis
+    Field("stock", "Stock", "Stock", "text", PRE_MARKET, placeholder="e.g., AAPL", row=1),
+    Field("trade_date", "Trade Date", "Trade Date", "date", PRE_MARKET, row=1),
+    Field("premarket_price", "Premarket Price", "Premarket Price", "number", PRE_MARKET, row=1),
+    Field("day_expected_range", "Day's Expected Range", "Day's Expected Range", "text", PRE_MARKET, placeholder="e.g., High/Low estimate", row=1),
+    Field("average_volume", "Average Volume", "Average Volume (in millions)", "number", PRE_MARKET, row=2),
+    Field("short_interest", "Short Interest", "Short Interest", "number", PRE_MARKET, row=2),
+    Field("short_ratio", "Short Ratio (Days to Cover)", "Short Ratio (Days to Cover)", "number", PRE_MARKET, row=2),
+    Field("market_context", "Market Context", "Market Context", "textarea", PRE_MARKET, placeholder="Briefly describe the overall market conditions..."),
+    Field("overall_bias", "Overall Bias", "Overall Bias", "select", PRE_MARKET, options=("Bullish", "Bearish", "Neutral")),
+    Field("key_catalysts", "Key Catalysts", "Key Catalysts", "textarea", PRE_MARKET, placeholder="List any news, earnings, or economic data..."),
+    Field("sector", "Sector", "Sector", "text", PRE_MARKET, placeholder="e.g., Technology"),
+    Field("sector_news", "Sector News", "Sector News", "textarea", PRE_MARKET, placeholder="Summarize any relevant news or trends..."),
+    Field("check_news", "Check for news and earnings releases", "Check for news and earnings releases", "checkbox", PRE_MARKET, heading="Pre-market Checklist"),
+    Field("review_overnight", "Review overnight price action and volume", "Review overnight price action and volume", "checkbox", PRE_MARKET),
+    Field("identify_gaps", "Identify potential gaps and their implications", "Identify potential gaps and their implications", "checkbox", PRE_MARKET),
+    Field("analyze_volume_checkbox", "Analyze pre-market volume and relative strength", "Analyze pre-market volume and relative strength", "checkbox", PRE_MARKET),
+    Field("initial_narrative_assessment", "Initial Market Narrative Assessment", "Initial Market Narrative Assessment", "textarea", PRE_MARKET, placeholder="Note any early observations about market sentiment..."),
+
+    # II. Key Levels
+    Field("resistance_2", "Resistance 2", "Resistance 2", "number", KEY_LEVELS, heading="Market-Recognized Levels (Previous Day/Week/Month)"),
+    Field("resistance_1", "Resistance 1", "Resistance 1", "number", KEY_LEVELS),
+    Field("pivot_point", "Pivot Point", "Pivot Point", "number", KEY_LEVELS),
+    Field("support_1", "Support 1", "Support 1", "number", KEY_LEVELS),
+    Field("support_2", "Support 2", "Support 2", "number", KEY_LEVELS),
+    Field("previous_day_close", "Previous Day Close", "Previous Day Close", "number", KEY_LEVELS),
+    Field("intraday_resistance", "Intraday Resistance", "Intraday Resistance", "textarea", KEY_LEVELS, heading="Intraday Levels (1-Minute Chart)", placeholder="Price(s) where price sharply reversed downwards..."),
+    Field("intraday_support", "Intraday Support", "Intraday Support", "textarea", KEY_LEVELS, placeholder="Price(s) where price sharply reversed upwards..."),
+    Field("current_price", "Current Price", "Current Price", "number", KEY_LEVELS),
+    Field("level_confluences", "Level Confluences", "Note any areas where Market-Recognized Levels and Intraday Levels align...", "checkbox", KEY_LEVELS),
+
+    # III. Primary Trade Setup
+    Field("level_of_interest", "Level of Interest", "Level of Interest", "text", TRADE_SETUP, placeholder="e.g., 123-123.5 range"),
+    Field("trade_direction", "Trade Direction", "Trade Direction", "select", TRADE_SETUP, options=("Long", "Short")),
+    Field("entry_condition", "Entry Condition", "Entry Condition", "textarea", TRADE_SETUP, placeholder="Specific price action, e.g., price reaches top of range..."),
+    Field("target", "Target", "Target", "text", TRADE_SETUP, placeholder="e.g., 120"),
+    Field("stop_loss", "Stop-Loss", "Stop-Loss", "text", TRADE_SETUP, placeholder="e.g., Above 124"),
+    Field("initial_position_size", "Initial Position Size", "Initial Position Size", "text", TRADE_SETUP, placeholder="To be calculated based on risk and capital"),
+    Field("consider_time", "Consider the time of day and its typical volatility.", "Consider the time of day and its typical volatility.", "checkbox", TRADE_SETUP, heading="Entry Timing"),
+    Field("note_specific_times", "Note any specific times to avoid or favor trading.", "Note any specific times to avoid or favor trading.", "textarea", TRADE_SETUP, placeholder="e.g., Avoid trading in the first 15 minutes..."),
+    Field("list_additional_factors", "List any additional factors that support the trade setup", "List any additional factors that support the trade setup", "textarea", TRADE_SETUP, heading="Trade Confluences", placeholder="e.g., trend alignment, chart patterns..."),
+    Field("narrative_context", "Narrative Context", "Narrative Context", "textarea", TRADE_SETUP, placeholder="Describe the prevailing market narrative..."),
+
+    # IV. What Ifs (Reactive Scenarios)
+    *_scenario("premarket_break", "Premarket Break", "A. Pre-Market Scenarios",
+               "1. What if the stock breaks a key level in the pre-market?",
+               "e.g., Price breaks above Resistance 1...", "e.g., Adjust entry strategy..."),
+    *_scenario("opening_price_far", "Opening Price Far", "A. Pre-Market Scenarios",
+               "2. What if the opening price is far from my Level of Interest?",
+               "e.g., The opening price is more than 1% away...", "e.g., Re-evaluate the relevance of the level..."),
+    *_scenario("overnight_gap", "Overnight Gap", "B. Opening Bell Scenarios",
+               "3. What if the stock has a large overnight gap?",
+               "e.g., Stock gaps up or down significantly (>2%)...", "e.g., Wait for the first 30 minutes of trading..."),
+    *_scenario("sharp_reversal", "Sharp Reversal", "B. Opening Bell Scenarios",
+               "4. What if the stock reverses sharply at the open?",
+               "e.g., Stock opens near a key level, then reverses...", "e.g., Consider trading the reversal...",
+               "narrative_reversal", "Note the initial market narrative and how it aligns..."),
+    *_scenario("reversal_before", "Reversal Before", "C. During the Trading Day Scenarios (Before Level of Interest)",
+               "5. What if price reverses before reaching the Level of Interest?",
+               "e.g., Price shows strong bullish momentum before 123...", "e.g., Re-evaluate bias...",
+               "narrative_reversal_before", "Is this reversal supported by the prevailing narrative?..."),
+    *_scenario("strong_trend", "Strong Trend", "C. During the Trading Day Scenarios (Before Level of Interest)",
+               "6. What if the stock is strongly trending?",
+               "e.g., The stock is in a strong uptrend...", "e.g., Favor long trades...",
+               "narrative_strong_trend", "Ensure the narrative supports continued trend strength..."),
+    *_scenario("range_bound", "Range Bound", "C. During the Trading Day Scenarios (Before Level of Interest)",
+               "7. What if the stock is range-bound?",
+               "e.g., The stock is trading in a defined range...", "e.g., Buy near support, sell near resistance...",
+               "narrative_range_bound", "Is the range-bound behavior due to conflicting narratives?..."),
+    *_scenario("blow_through", "Blow Through", "D. At the Level of Interest",
+               "8. What if price blows through the Level of Interest?",
+               "e.g., Price breaks above 123.5...", "e.g., Invalidate short setup...",
+               "narrative_blow_through", "Does this breakout confirm the prevailing narrative?..."),
+    *_scenario("consolidates", "Consolidates", "D. At the Level of Interest",
+               "9. What if price consolidates at the Level of Interest?",
+               "e.g., Price consolidates in the 123-123.5 range...", "e.g., Be cautious. Reduce position size...",
+               "narrative_consolidates", "Is this consolidation a sign of narrative indecision?..."),
+    *_scenario("low_volume", "Low Volume", "D. At the Level of Interest",
+               "10. What if the stock's trading volume is low at a key level?",
+               "e.g., Price approaches a key level...", "e.g., Reduce position size...",
+               "narrative_low_volume", "Does the low volume suggest a lack of conviction?..."),
+    *_scenario("false_breakout", "False Breakout", "D. At the Level of Interest",
+               "11. What if the stock shows a false breakout?",
+               "e.g., Price breaks a key resistance level...", "e.g., Be cautious on longs...",
+               "narrative_false_breakout", "Does this false breakout signal a potential narrative change?..."),
+    *_scenario("target_reached_quickly", "Target Reached Quickly", "E. After Target is Reached",
+               "12. What if the target is reached quickly?",
+               "e.g., Price reaches 120 very quickly...", "e.g., Scale out some profits...",
+               "narrative_target_reached_quickly", "Does the strength of the move suggest the narrative is likely to continue?..."),
+    *_scenario("volatility_increase", "Volatility Increase", "F. Other Scenarios",
+               "13. What if the stock's volatility increases significantly?",
+               "e.g., The stock's ATR increases significantly...", "e.g., Reduce position size...",
+               "narrative_volatility_increase", "Is the increased volatility a sign of a narrative shift?..."),
+    *_scenario("fails_hold_level", "Fails Hold Level", "F. Other Scenarios",
+               "14. What if the stock fails to hold an important level?",
+               "e.g., Price breaks a key support level...", "e.g., Close long position...",
+               "narrative_fails_hold_level", "Does this failure confirm a bearish narrative?..."),
+    *_scenario("gaps_consolidates", "Gaps Consolidates", "F. Other Scenarios",
+               "15. What if the stock gaps and then consolidates?",
+               "e.g., Stock gaps up or down and then consolidates...", "e.g., Wait for a breakout from the consolidation...",
+               "narrative_gaps_consolidates", "What does the consolidation tell us about the strength of the gap narrative?..."),
+    *_scenario("stock_halted", "Stock Halted", "F. Other Scenarios",
+               "16. What if the stock is halted multiple times?",
+               "e.g., Stock is halted multiple times...", "e.g., Greatly reduce or eliminate position...",
+               "narrative_stock_halted", "Halts indicate high uncertainty and a potentially unstable narrative..."),
+    *_scenario("news_event", "News Event", "F. Other Scenarios",
+               "17. What if the stock is approaching a major news event?",
+               "e.g., Stock approaching earnings release...", "e.g., Reduce position size significantly...",
+               "narrative_news_event", "The news event will likely create a new narrative..."),
+
+    # V. Risk Management
+    Field("position_sizing", "Position Sizing", "Position Sizing", "text", RISK_MANAGEMENT, placeholder="e.g., Calculate in real-time..."),
+    Field("max_daily_loss", "Maximum Daily Loss", "Maximum Daily Loss", "number", RISK_MANAGEMENT, placeholder="e.g., State the maximum amount you are willing to lose...", row="risk_limits"),
+    Field("account_equity", "Account Equity", "Account Equity", "number", RISK_MANAGEMENT, row="risk_limits"),
+    Field("risk_per_trade_pct", "Risk Per Trade (%)", "Risk Per Trade (%)", "number", RISK_MANAGEMENT, row="risk_limits"),
+    Field("contingency_plan", "Contingency Plan", "Contingency Plan", "textarea", RISK_MANAGEMENT, placeholder="Describe your plan if your maximum daily loss is hit..."),
+    Field("check_position_size", "Confirm position size aligns with risk tolerance.", "Confirm position size aligns with risk tolerance.", "checkbox", RISK_MANAGEMENT, heading="Risk Assessment Checklist"),
+    Field("ensure_stop_loss", "Ensure stop-loss is appropriately placed.", "Ensure stop-loss is appropriately placed.", "checkbox", RISK_MANAGEMENT),
+    Field("evaluate_risk_reward", "Evaluate the risk/reward ratio of the trade.", "Evaluate the risk/reward ratio of the trade.", "checkbox", RISK_MANAGEMENT),
+    Field("consider_correlated_trades", "Consider the impact of correlated trades.", "Consider the impact of correlated trades.", "checkbox", RISK_MANAGEMENT),
+    Field("narrative_risk_assessment", "Narrative Risk Assessment", "Narrative Risk Assessment", "textarea", RISK_MANAGEMENT, placeholder="How might the evolving market narrative affect the risk of this trade?..."),
+
+    # VI. Trade Management
+    Field("scaling_in_out", "Scaling In/Out", "Scaling In/Out", "textarea", TRADE_MANAGEMENT, placeholder="Describe if and how you will scale into or out of positions..."),
+    Field("time_management", "Time Management", "Time Management", "textarea", TRADE_MANAGEMENT, placeholder="Note any time-based rules..."),
+    Field("notes", "Notes", "Notes", "textarea", TRADE_MANAGEMENT, placeholder="Use this section for any additional notes or observations..."),
+    Field("post_trade_review", "Post-Trade Review", "Post-Trade Review", "textarea", TRADE_MANAGEMENT, placeholder="Describe how you will review your trades..."),
+    Field("check_entry_plan", "Was the entry in line with the trading plan?", "Was the entry in line with the trading plan?", "checkbox", TRADE_MANAGEMENT, heading="Trade Review Questions"),
+    Field("check_stop_loss", "Was the stop-loss correctly placed and honored?", "Was the stop-loss correctly placed and honored?", "checkbox", TRADE_MANAGEMENT),
+    Field("check_target", "Was the target achieved? If not, why?", "Was the target achieved? If not, why?", "checkbox", TRADE_MANAGEMENT),
+    Field("check_emotions", "Were emotions controlled throughout the trade?", "Were emotions controlled throughout the trade?", "checkbox", TRADE_MANAGEMENT),
+    Field("check_lessons", "What lessons can be learned from this trade?", "What lessons can be learned from this trade?", "checkbox", TRADE_MANAGEMENT),
+    Field("narrative_review", "Narrative Review", "Narrative Review", "textarea", TRADE_MANAGEMENT, placeholder="How did the market narrative evolve during the trade?..."),
+]
+
+FIELDS_BY_KEY = {field.key: field for field in FIELDS}
+FIELDS_BY_SECTION = {section: [field for field in FIELDS if field.section == section] for section in SECTIONS}
+
+# Scenario key -> title, e.g. "premarket_break" -> "Premarket Break"
+SCENARIOS = {field.key[len("rule_"):]: field.column[len("RULE - "):] for field in FIELDS if field.key.startswith("rule_")}
+
+
+def plan_data(values):
+    """
+    Maps widget values (key -> value, e.g. st.session_state) to the stored
+    plan data (column -> value).
+    """
+    data = {}
+    for field in FIELDS:
+        value = values.get(field.key)
+        if isinstance(value, datetime.date):
+            value = value.isoformat()
+        data[field.column] = value
+    return data
+
+
+def form_values(data):
+    """
+    Maps stored plan data (column -> value) back to widget values (key ->
+    value), e.g. to load a saved plan into the form. Missing or invalid values
+    are left out so their widgets keep their defaults.
+    """
+    values = {}
+    for field in FIELDS:
+        value = data.get(field.column)
+        if value is None:
+            continue
+        try:
+            if field.kind == "date":
+                value = datetime.date.fromisoformat(str(value))
+            elif field.kind == "number":
+                value = float(value)
+            elif field.kind == "checkbox":
+                value = bool(value)
+            elif field.kind == "select" and value not in field.options:
+                continue
+            else:
+                value = str(value)
+        except ValueError:
+            continue
+        values[field.key] = value
+    return values
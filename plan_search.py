@@ -0,0 +1,123 @@
+import re
+from dataclasses import dataclass
+
+from plan_schema import FIELDS, FIELDS_BY_KEY
+
+# Free-text fields indexed for search: every narrative, scenario and review text area
+SEARCH_COLUMNS = [field.column for field in FIELDS if field.kind == "textarea"]
+BIAS_COLUMN = FIELDS_BY_KEY["overall_bias"].column
+DIRECTION_COLUMN = FIELDS_BY_KEY["trade_direction"].column
+
+# One row per plan (rowid = plan_id). body holds the text of the filled-in
+# fields only, without their labels, so label words never match; labels
+# (not indexed) names each of them, for snippets. ticker, bias and direction
+# are indexed as their own columns so those filters are resolved by the index
+# together with the query; owner and trade date are filtered on the plans
+# table. The prefix indexes make short "term*" queries as cheap as whole words.
+SEARCH_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS plan_search USING fts5(
+    body, ticker, bias, direction, labels UNINDEXED,
+    tokenize = 'porter unicode61', prefix = '2 3 4'
+)
+"""
+# Separates the fields in body and labels; the tokenizer treats it as whitespace
+FIELD_SEPARATOR = "\x1e"
+# Words of context kept around the first match in a snippet
+SNIPPET_WORDS = 24
+
+OPERATORS = ("AND", "OR", "NOT")
+_TOKEN = re.compile(r'"[^"]*"?\*?|\S+')
+
+
+@dataclass
+class SearchHit:
+    """
+    A plan matching a search, with a snippet of its text around the matched terms.
+    """
+    plan_id: int
+    ticker: str
+    trade_date: str
+    snippet: str
+    score: float
+
+
+def search_document(data):
+    """
+    Returns the searchable text of a plan and the labels of its parts: the
+    non-empty text areas, each joined by FIELD_SEPARATOR.
+    """
+    columns = [column for column in SEARCH_COLUMNS if data.get(column)]
+    body = FIELD_SEPARATOR.join(str(data[column]).replace(FIELD_SEPARATOR, " ") for column in columns)
+    return body, FIELD_SEPARATOR.join(columns)
+
+
+def index_plan(conn, plan_id, data):
+    """
+    (Re)indexes one stored plan. Runs on the caller's connection, inside the
+    transaction that saved the plan, so the index never lags the store.
+    """
+    body, labels = search_document(data)
+    conn.execute("DELETE FROM plan_search WHERE rowid = ?", (plan_id,))
+    conn.execute(
+        "INSERT INTO plan_search (rowid, body, ticker, bias, direction, labels) SELECT plan_id, ?, ticker, ?, ?, ? FROM plans WHERE plan_id = ?",
+        (body, data.get(BIAS_COLUMN) or "", data.get(DIRECTION_COLUMN) or "", labels, plan_id),
+    )
+
+
+def snippet(highlighted, labels, open_marker, words=SNIPPET_WORDS):
+    """
+    Builds a "Label: …text…" snippet from a plan's body with its matches
+    highlighted (FTS5 highlight()): the first field with a match, cut to
+    `words` words around the first one.
+    """
+    fields = highlighted.split(FIELD_SEPARATOR)
+    labels = labels.split(FIELD_SEPARATOR)
+    index = next((i for i, field in enumerate(fields) if open_marker in field), 0)
+    text = fields[index].split()
+    first = next((i for i, word in enumerate(text) if open_marker in word), 0)
+    start = max(0, min(first - words // 3, len(text) - words))
+    shown = " ".join(text[start:start + words])
+    if start > 0:
+        shown = "…" + shown
+    if start + words < len(text):
+        shown += "…"
+    return f"{labels[index]}: {shown}" if index < len(labels) else shown
+
+
+def _phrase(text):
+    return '"' + text.replace('"', '""') + '"'
+
+
+def match_expression(query, ticker=None, bias=None, direction=None):
+    """
+    Builds an FTS5 MATCH expression from a user query, or returns None if the
+    query has no terms.
+
+    Words are matched by stem (porter), "quoted text" as a phrase, and a
+    trailing * as a prefix; AND, OR and NOT work as usual (terms are ANDed by
+    default). Everything else is quoted, so no query is a syntax error.
+    """
+    terms = []
+    for token in _TOKEN.findall(query or ""):
+        if token in OPERATORS:
+            # FTS5 operators are binary: drop leading ones and let the last of
+            # a run win, so "a AND NOT b" means "a NOT b"
+            if terms and terms[-1] in OPERATORS:
+                terms[-1] = token
+            elif terms:
+                terms.append(token)
+            continue
+        prefix = token.endswith("*")
+        text = token.rstrip("*").strip('"').strip()
+        if text:
+            terms.append(_phrase(text) + ("*" if prefix else ""))
+    while terms and terms[-1] in OPERATORS:
+        terms.pop()
+    if not terms:
+        return None
+
+    expression = f"body : ({' '.join(terms)})"
+    for column, value in (("ticker", ticker), ("bias", bias), ("direction", direction)):
+        if value:
+            expression += f" AND {column} : {_phrase(value)}"
+    return expression
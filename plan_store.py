@@ -0,0 +1,463 @@
+import datetime
+import json
+import os
+import sqlite3
+from contextlib import closing
+from dataclasses import dataclass
+
+import pandas as pd
+
+from instrumentation import timed_io
+from plan_rollups import ROLLUP_COLUMNS, ROLLUP_SCHEMA, rollup_all, rollup_plan, week_start
+from plan_search import SEARCH_SCHEMA, SearchHit, index_plan, match_expression, snippet
+
+DEFAULT_DB_NAME = "trading_plans.db"
+# Trader namespace of plans saved without a Trader name, and of the plans
+# saved before there were traders
+DEFAULT_OWNER = "default"
+# Number of most recent matching plans search() ranks
+SEARCH_WINDOW = 2000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS plans (
+    plan_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    owner TEXT NOT NULL DEFAULT '',
+    ticker TEXT NOT NULL,
+    trade_date TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    updated_at TEXT,
+    revision INTEGER NOT NULL DEFAULT 1,
+    data TEXT NOT NULL
+);
+"""
+
+# Columns added after the first release, for upgrading older store files
+_ADDED_COLUMNS = {
+    "owner": "TEXT NOT NULL DEFAULT ''",
+    "updated_at": "TEXT",
+    "revision": "INTEGER NOT NULL DEFAULT 1",
+}
+
+_INDEXES = """
+CREATE INDEX IF NOT EXISTS idx_plans_ticker_date ON plans (ticker, trade_date);
+CREATE INDEX IF NOT EXISTS idx_plans_trade_date ON plans (trade_date);
+CREATE INDEX IF NOT EXISTS idx_plans_owner_ticker_date ON plans (owner, ticker, trade_date);
+CREATE INDEX IF NOT EXISTS idx_plans_owner_trade_date ON plans (owner, trade_date);
+"""
+
+
+def default_db_path():
+    """
+    Returns the plan store path: $TRADE_PLANNER_DB, or trading_plans.db next
+    to the app (never relative to the working directory).
+    """
+    return os.environ.get("TRADE_PLANNER_DB") or os.path.join(os.path.dirname(os.path.abspath(__file__)), DEFAULT_DB_NAME)
+
+
+class StalePlanError(Exception):
+    """
+    Raised when a plan is saved over a revision other than the one it was loaded at.
+    """
+
+
+@dataclass
+class PlanSummary:
+    """
+    The indexed key of a stored plan, available without decoding its data.
+    """
+    plan_id: int
+    ticker: str
+    trade_date: str
+    created_at: str
+
+
+@dataclass
+class StoredPlan(PlanSummary):
+    """
+    A stored plan together with its form data (column label -> value).
+    """
+    data: dict
+    revision: int = 1
+
+
+class PlanStore:
+    """
+    Store of trading plans, keyed by ticker, trade date and plan id.
+
+    Plans live in a SQLite file with one row per plan. Lookups by plan id,
+    ticker or trade date go through an index, so loading one plan never reads
+    the rest of the history and saving stays constant-time as it grows.
+
+    The file is shared by every session on the server. Each write is a single
+    SQLite transaction, and the write-ahead log lets readers keep reading
+    while a save is in progress. A store opened with an `owner` only sees and
+    saves that owner's plans; a store opened without one sees every plan and
+    saves under DEFAULT_OWNER. Edits go through update(), which refuses to
+    overwrite a plan that changed since it was loaded.
+
+    The plans' narrative text is kept in an FTS5 index (see search()), and
+    their checklists in daily and weekly rollups (see rollups()), both updated
+    in the same transaction as each save.
+    """
+
+    def __init__(self, path=None, owner=None):
+        self.path = path or default_db_path()
+        self.owner = owner
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(plans)")}
+            if not columns.issuperset(_ADDED_COLUMNS):
+                with conn:
+                    conn.execute("BEGIN IMMEDIATE")
+                    columns = {row[1] for row in conn.execute("PRAGMA table_info(plans)")}
+                    for column, definition in _ADDED_COLUMNS.items():
+                        if column not in columns:
+                            conn.execute(f"ALTER TABLE plans ADD COLUMN {column} {definition}")
+            conn.executescript(_INDEXES)
+            if _has_ownerless_plans(conn):
+                with conn:
+                    conn.execute("BEGIN IMMEDIATE")
+                    conn.execute("UPDATE plans SET owner = ? WHERE owner = ''", (DEFAULT_OWNER,))
+                    if _has_table(conn, "plan_rollup_weeks"):
+                        rollup_all(conn)
+            if not _has_search_index(conn):
+                with conn:
+                    conn.execute("BEGIN IMMEDIATE")
+                    if not _has_search_index(conn):
+                        # Indexes written before labels were kept apart indexed the label words too
+                        conn.execute("DROP TABLE IF EXISTS plan_search")
+                        conn.execute(SEARCH_SCHEMA)
+                        _index_all(conn)
+            if not _has_table(conn, "plan_rollup_weeks"):
+                with conn:
+                    conn.execute("BEGIN IMMEDIATE")
+                    if not _has_table(conn, "plan_rollup_weeks"):
+                        for statement in ROLLUP_SCHEMA.split(";"):
+                            conn.execute(statement)
+                        rollup_all(conn)
+
+    def _connect(self):
+        # Wait for a concurrent writer instead of failing with "database is locked"
+        conn = sqlite3.connect(self.path, timeout=30)
+        # With a write-ahead log, NORMAL still never corrupts the file; it only
+        # skips the fsync on each commit
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _where(self, **filters):
+        return _where(owner=self.owner, **filters)
+
+    def save(self, data, ticker, trade_date=None):
+        """
+        Appends a plan and returns its plan id.
+        """
+        ticker = (ticker or "").strip().upper()
+        trade_date = _as_date_str(trade_date or datetime.date.today())
+        created_at = datetime.datetime.now().isoformat(timespec="seconds")
+        payload = _payload(data)
+        with timed_io("plan_store.save") as io, closing(self._connect()) as conn, conn:
+            io["bytes_written"] = len(payload)
+            cursor = conn.execute(
+                "INSERT INTO plans (owner, ticker, trade_date, created_at, data) VALUES (?, ?, ?, ?, ?)",
+                (self.owner or DEFAULT_OWNER, ticker, trade_date, created_at, payload),
+            )
+            index_plan(conn, cursor.lastrowid, data)
+            rollup_plan(conn, self.owner or DEFAULT_OWNER, trade_date, data)
+            return cursor.lastrowid
+
+    def update(self, plan_id, data, ticker, trade_date, expected_revision):
+        """
+        Overwrites a plan, provided it is still at `expected_revision`, and
+        returns its new revision. Raises StalePlanError if the plan was changed
+        (or deleted) since it was loaded.
+        """
+        ticker = (ticker or "").strip().upper()
+        updated_at = datetime.datetime.now().isoformat(timespec="seconds")
+        payload = _payload(data)
+        where, params = self._where(plan_id=plan_id)
+        with timed_io("plan_store.update") as io, closing(self._connect()) as conn, conn:
+            io["bytes_written"] = len(payload)
+            # Read the plan's previous version in the same write transaction, to take it out of the rollups
+            conn.execute("BEGIN IMMEDIATE")
+            previous = conn.execute("SELECT owner, trade_date, data FROM plans" + where, params).fetchone()
+            cursor = conn.execute(
+                "UPDATE plans SET ticker = ?, trade_date = ?, updated_at = ?, data = ?, revision = revision + 1"
+                + where + " AND revision = ?",
+                [ticker, _as_date_str(trade_date), updated_at, payload, *params, int(expected_revision)],
+            )
+            if cursor.rowcount == 0:
+                row = conn.execute("SELECT revision FROM plans" + where, params).fetchone()
+                if row is None:
+                    raise StalePlanError(f"Trading plan #{plan_id} no longer exists.")
+                raise StalePlanError(
+                    f"Trading plan #{plan_id} was changed by someone else (revision {row[0]}, "
+                    f"you loaded revision {expected_revision})."
+                )
+            index_plan(conn, int(plan_id), data)
+            rollup_plan(conn, previous[0], trade_date, data, previous=(previous[1], json.loads(previous[2])))
+        return int(expected_revision) + 1
+
+    def get(self, plan_id):
+        """
+        Returns the plan with the given id, or None if there is no such plan.
+        """
+        where, params = self._where(plan_id=plan_id)
+        with timed_io("plan_store.get") as io, closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT plan_id, ticker, trade_date, created_at, data, revision FROM plans" + where, params
+            ).fetchone()
+            io["bytes_read"] = len(row[4]) if row else 0
+        if row is None:
+            return None
+        return StoredPlan(*row[:4], data=json.loads(row[4]), revision=row[5])
+
+    def find(self, ticker=None, trade_date=None, limit=None, offset=0):
+        """
+        Returns summaries of the plans matching the given ticker and/or trade
+        date, newest first.
+        """
+        where, params = self._where(ticker=ticker, trade_date=trade_date)
+        query = "SELECT plan_id, ticker, trade_date, created_at FROM plans" + where + " ORDER BY plan_id DESC"
+        if limit is not None:
+            query += " LIMIT ? OFFSET ?"
+            params += [int(limit), int(offset)]
+        with timed_io("plan_store.find") as io, closing(self._connect()) as conn:
+            rows = conn.execute(query, params).fetchall()
+            io["rows"] = len(rows)
+        return [PlanSummary(*row) for row in rows]
+
+    def count(self, ticker=None, trade_date=None):
+        """
+        Returns the number of plans matching the given ticker and/or trade date.
+        """
+        where, params = self._where(ticker=ticker, trade_date=trade_date)
+        with timed_io("plan_store.count"), closing(self._connect()) as conn:
+            return conn.execute("SELECT COUNT(*) FROM plans" + where, params).fetchone()[0]
+
+    def plans_for_ticker(self, ticker, limit=None):
+        return self.find(ticker=ticker, limit=limit)
+
+    def plans_for_date(self, trade_date, limit=None):
+        return self.find(trade_date=trade_date, limit=limit)
+
+    def plans_between(self, start_date, end_date):
+        """
+        Returns the full plans with a trade date in [start_date, end_date], oldest first.
+        """
+        where, params = self._where(date_range=(start_date, end_date))
+        with timed_io("plan_store.plans_between") as io, closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT plan_id, ticker, trade_date, created_at, data, revision FROM plans" + where + " ORDER BY trade_date, plan_id",
+                params,
+            ).fetchall()
+            io["rows"], io["bytes_read"] = len(rows), sum(len(row[4]) for row in rows)
+        return [StoredPlan(*row[:4], data=json.loads(row[4]), revision=row[5]) for row in rows]
+
+    def frame(self, columns, ticker=None, trade_date=None):
+        """
+        Returns a DataFrame with plan_id, owner, ticker, trade_date and the
+        given data columns of the matching plans. Only those columns are
+        extracted from each plan, inside SQLite.
+        """
+        where, params = self._where(ticker=ticker, trade_date=trade_date)
+        selects = ", ".join("json_extract(data, ?)" for _ in columns)
+        query = f"SELECT plan_id, owner, ticker, trade_date{', ' if columns else ''}{selects} FROM plans{where} ORDER BY plan_id"
+        paths = [f'$."{column}"' for column in columns]
+        with timed_io("plan_store.frame") as io, closing(self._connect()) as conn:
+            rows = conn.execute(query, paths + params).fetchall()
+            io["rows"] = len(rows)
+        return pd.DataFrame.from_records(rows, columns=["plan_id", "owner", "ticker", "trade_date", *columns])
+
+    def _search_matches(self, query, ticker, start_date, end_date, bias, direction):
+        # The FROM/WHERE clause and parameters of the plans matching a search, or None if the query has no terms
+        expression = match_expression(query, ticker=ticker, bias=bias, direction=direction)
+        if expression is None:
+            return None, None
+        where, params = "plan_search MATCH :match", {"match": expression}
+        if self.owner is not None:
+            where += " AND plans.owner = :owner"
+            params["owner"] = self.owner
+        if start_date:
+            where += " AND plans.trade_date >= :start"
+            params["start"] = _as_date_str(start_date)
+        if end_date:
+            where += " AND plans.trade_date <= :end"
+            params["end"] = _as_date_str(end_date)
+        # CROSS JOIN keeps the index as the outer loop: each match is checked
+        # against its plans row by primary key
+        return f"FROM plan_search CROSS JOIN plans ON plans.plan_id = plan_search.rowid WHERE {where}", params
+
+    def search(self, query, ticker=None, start_date=None, end_date=None, bias=None, direction=None,
+               limit=50, highlight=("**", "**"), window=SEARCH_WINDOW):
+        """
+        Full-text search over the plans' narrative and scenario text. Returns
+        up to `limit` SearchHits, best match first, each with a snippet of the
+        matching text wrapped in `highlight` markers. Filters narrow the hits
+        to a ticker, a trade date range, an Overall Bias or a Trade Direction.
+
+        Every match is ranked unless there are more than `window`; then only
+        the `window` most recently saved ones are, which bounds the cost of
+        terms that occur in almost every plan (see count_matches).
+        """
+        matches, params = self._search_matches(query, ticker, start_date, end_date, bias, direction)
+        if matches is None:
+            return []
+        params.update(limit=int(limit), window=int(window), open=highlight[0], close=highlight[1])
+        # Ranking uses the text only, not the filter columns, and snippets are
+        # built for the returned hits only
+        query = (
+            f"WITH recent AS (SELECT plan_search.rowid AS plan_id {matches} ORDER BY plan_search.rowid DESC LIMIT :window), "
+            f"hits AS (SELECT plans.plan_id, plans.ticker, plans.trade_date, bm25(plan_search, 1, 0, 0, 0, 0) AS score {matches} "
+            "AND plan_search.rowid >= (SELECT MIN(plan_id) FROM recent) ORDER BY score LIMIT :limit) "
+            "SELECT hits.plan_id, hits.ticker, hits.trade_date, highlight(plan_search, 0, :open, :close), plan_search.labels, score "
+            "FROM hits CROSS JOIN plan_search WHERE plan_search MATCH :match AND plan_search.rowid = hits.plan_id ORDER BY score"
+        )
+        with timed_io("plan_store.search") as io, closing(self._connect()) as conn:
+            rows = conn.execute(query, params).fetchall()
+            io["rows"] = len(rows)
+        return [
+            SearchHit(plan_id, ticker, trade_date, snippet(body, labels, highlight[0]), score)
+            for plan_id, ticker, trade_date, body, labels, score in rows
+        ]
+
+    def count_matches(self, query, ticker=None, start_date=None, end_date=None, bias=None, direction=None, window=SEARCH_WINDOW):
+        """
+        Returns how many plans match a search, counting up to `window` + 1:
+        more than `window` means search() ranked only the most recent ones.
+        """
+        matches, params = self._search_matches(query, ticker, start_date, end_date, bias, direction)
+        if matches is None:
+            return 0
+        params["window"] = int(window)
+        with timed_io("plan_store.count_matches"), closing(self._connect()) as conn:
+            return conn.execute(f"SELECT COUNT(*) FROM (SELECT 1 {matches} LIMIT :window + 1)", params).fetchone()[0]
+
+    def rebuild_search_index(self):
+        """
+        Re-indexes every plan in the file, e.g. after plans were written by
+        something other than PlanStore.
+        """
+        with closing(self._connect()) as conn, conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute("DELETE FROM plan_search")
+            _index_all(conn)
+
+    def rollup_versions(self, start_date, end_date):
+        """
+        Returns {week start: version} for the weeks overlapping [start_date,
+        end_date] that have (or had) plans. A week's version changes whenever a plan in
+        it is saved, edited or moved out of it.
+        """
+        where, params = _where(owner=self.owner)
+        where += (" AND " if where else " WHERE ") + "week_start BETWEEN ? AND ?"
+        params += [week_start(_as_date_str(start_date)).isoformat(), _as_date_str(end_date)]
+        with timed_io("plan_store.rollup_versions"), closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT week_start, SUM(version) FROM plan_rollup_weeks" + where + " GROUP BY week_start ORDER BY week_start", params
+            ).fetchall()
+        return dict(rows)
+
+    def rollups(self, week):
+        """
+        Returns the rollups of the week starting on `week` (a Monday) and of
+        its days, as a DataFrame with period ("day" or "week"), period_start,
+        dimension, value, metric and count. Its size depends on how many
+        distinct sectors and scenarios the week has, not on how many plans.
+        """
+        start = week_start(_as_date_str(week))
+        where, params = _where(owner=self.owner)
+        where += (" AND " if where else " WHERE ") + "period_start BETWEEN ? AND ?"
+        params += [start.isoformat(), (start + datetime.timedelta(days=6)).isoformat()]
+        with timed_io("plan_store.rollups") as io, closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT period, period_start, dimension, value, metric, SUM(count) FROM plan_rollups" + where
+                + " GROUP BY period, period_start, dimension, value, metric", params
+            ).fetchall()
+            io["rows"] = len(rows)
+        return pd.DataFrame.from_records(rows, columns=ROLLUP_COLUMNS)
+
+    def rebuild_rollups(self):
+        """
+        Recomputes the rollups from every plan in the file, e.g. after plans
+        were written by something other than PlanStore.
+        """
+        with closing(self._connect()) as conn, conn:
+            conn.execute("BEGIN IMMEDIATE")
+            rollup_all(conn)
+
+    def tickers(self):
+        """
+        Returns the distinct tickers in the store, in alphabetical order.
+        """
+        where, params = self._where()
+        with timed_io("plan_store.tickers"), closing(self._connect()) as conn:
+            rows = conn.execute("SELECT DISTINCT ticker FROM plans" + where + " ORDER BY ticker", params).fetchall()
+        return [row[0] for row in rows]
+
+    def signature(self):
+        """
+        Returns a value that changes whenever the store changes, for use as a
+        cache key. Saves land in the write-ahead log first, so its mtime and
+        size are part of the signature.
+        """
+        signature = [self.path]
+        for path in [self.path, self.path + "-wal"]:
+            try:
+                stat = os.stat(path)
+                signature += [stat.st_mtime_ns, stat.st_size]
+            except FileNotFoundError:
+                signature += [None, None]
+        return tuple(signature)
+
+
+def _where(owner=None, ticker=None, trade_date=None, plan_id=None, date_range=None):
+    clauses, params = [], []
+    if owner is not None:
+        clauses.append("owner = ?")
+        params.append(owner)
+    if plan_id is not None:
+        clauses.append("plan_id = ?")
+        params.append(int(plan_id))
+    if date_range is not None:
+        clauses.append("trade_date BETWEEN ? AND ?")
+        params += [_as_date_str(date_range[0]), _as_date_str(date_range[1])]
+    if ticker:
+        clauses.append("ticker = ?")
+        params.append(ticker.strip().upper())
+    if trade_date:
+        clauses.append("trade_date = ?")
+        params.append(_as_date_str(trade_date))
+    if not clauses:
+        return "", params
+    return " WHERE " + " AND ".join(clauses), params
+
+
+def _has_ownerless_plans(conn):
+    # Plans saved before the owner column existed (or by older versions, with owner '')
+    return conn.execute("SELECT 1 FROM plans WHERE owner = '' LIMIT 1").fetchone() is not None
+
+
+def _has_search_index(conn):
+    return any(row[1] == "labels" for row in conn.execute("PRAGMA table_info(plan_search)"))
+
+
+def _has_table(conn, name):
+    return conn.execute("SELECT 1 FROM sqlite_master WHERE name = ?", (name,)).fetchone() is not None
+
+
+def _index_all(conn):
+    # Indexes the plans saved before the search index existed
+    for plan_id, data in conn.execute("SELECT plan_id, data FROM plans").fetchall():
+        index_plan(conn, plan_id, json.loads(data))
+
+
+def _payload(data):
+    # Plans are mostly empty text fields; leave them out instead of storing ""
+    return json.dumps({column: value for column, value in data.items() if value not in (None, "")}, default=str)
+
+
+def _as_date_str(value):
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.strftime("%Y-%m-%d")
+    return str(value)
@@ -0,0 +1,121 @@
+import numpy as np
+import pandas as pd
+
+from plan_schema import FIELDS_BY_KEY
+
+# Form fields the risk engine reads, by field key
+RISK_FIELDS = [
+    "sector", "trade_direction", "level_of_interest", "current_price", "premarket_price",
+    "target", "stop_loss", "initial_position_size", "account_equity", "risk_per_trade_pct",
+    "max_daily_loss",
+]
+
+_NUMBER = r"(-?\d+(?:,\d{3})*(?:\.\d+)?)"
+# A price or a price range, e.g. "120", "Above 124", "123-123.5 range", "123 to 124"
+_PRICE_RANGE = _NUMBER + r"(?:\s*(?:-|–|to)\s*" + _NUMBER + r")?"
+
+
+def _to_float(values):
+    return pd.to_numeric(values.str.replace(",", "", regex=False), errors="coerce")
+
+
+def parse_price_ranges(text):
+    """
+    Parses free-text prices (a Series) into a frame of low and high bounds. A
+    single price has low == high; text without a number gives NaN.
+    """
+    text = pd.Series(text, dtype="object")
+    text = text.astype(str).where(text.notna(), "")
+    bounds = text.str.extract(_PRICE_RANGE)
+    first, second = _to_float(bounds[0]), _to_float(bounds[1])
+    second = second.fillna(first)
+    return pd.DataFrame({"low": np.fmin(first, second), "high": np.fmax(first, second)}, dtype=np.float64)
+
+
+def parse_prices(text):
+    """
+    Parses free-text prices (a Series) into floats. A range such as
+    "123-123.5" becomes its midpoint; text without a number becomes NaN.
+    """
+    bounds = parse_price_ranges(text)
+    return (bounds["low"] + bounds["high"]) / 2
+
+
+def _numbers(values):
+    values = pd.to_numeric(pd.Series(values), errors="coerce").astype(np.float64)
+    return values.where(values > 0)
+
+
+def risk_frame(plans):
+    """
+    Computes the per-plan risk figures of a frame of plans (one row per plan,
+    with the RISK_FIELDS as columns) in one vectorized pass.
+
+    The entry is the Level of Interest (midpoint of a range), falling back to
+    the Current and then the Premarket Price. Suggested shares risk
+    Risk Per Trade (%) of Account Equity; a numeric Initial Position Size
+    overrides them.
+    """
+    entry = parse_prices(plans["level_of_interest"]).fillna(_numbers(plans["current_price"])).fillna(_numbers(plans["premarket_price"]))
+    target = parse_prices(plans["target"])
+    stop = parse_prices(plans["stop_loss"])
+    side = np.where(plans["trade_direction"].eq("Short"), -1.0, 1.0)
+
+    risk_per_share = (entry - stop) * side
+    reward_per_share = (target - entry) * side
+    valid = (risk_per_share > 0) & (reward_per_share > 0)
+    risk_budget = _numbers(plans["account_equity"]) * _numbers(plans["risk_per_trade_pct"]) / 100
+    suggested = np.floor(risk_budget / risk_per_share.where(valid))
+    planned = parse_prices(plans["initial_position_size"])
+    shares = planned.fillna(suggested)
+
+    result = pd.DataFrame({
+        "plan_id": plans["plan_id"].to_numpy(),
+        "ticker": plans["ticker"].to_numpy(),
+        "sector": plans["sector"].fillna("").replace("", "Unknown").to_numpy(),
+        "direction": plans["trade_direction"].to_numpy(),
+        "entry": entry.to_numpy(),
+        "stop": stop.to_numpy(),
+        "target": target.to_numpy(),
+        "valid": valid.to_numpy(),
+        "risk_per_share": risk_per_share.where(valid).to_numpy(),
+        "r_multiple": (reward_per_share / risk_per_share).where(valid).to_numpy(),
+        "suggested_shares": suggested.to_numpy(),
+        "shares": shares.to_numpy(),
+    })
+    result["at_risk"] = result["shares"] * result["risk_per_share"]
+    result["exposure"] = result["shares"] * result["entry"]
+    result["max_daily_loss"] = _numbers(plans["max_daily_loss"]).to_numpy()
+    return result
+
+
+def day_risk(plans):
+    """
+    Aggregates the risk of one day's plans (a risk_frame, in save order).
+
+    The day's loss limit is the largest Maximum Daily Loss entered on any of
+    them. A plan is flagged when its own risk exceeds its limit, or when it
+    adds risk once the day's cumulative at-risk capital is above the day's limit.
+
+    Returns (plans with cumulative_at_risk and breach flags, per-sector totals,
+    the day's limit).
+    """
+    plans = plans.copy()
+    limit = plans["max_daily_loss"].max()
+    plans["cumulative_at_risk"] = plans["at_risk"].fillna(0).cumsum()
+    plans["breaches_own_limit"] = plans["at_risk"] > plans["max_daily_loss"]
+    plans["breaches_daily_limit"] = (plans["cumulative_at_risk"] > limit) & (plans["at_risk"] > 0)
+    sectors = plans.groupby("sector").agg(
+        plans=("plan_id", "size"), at_risk=("at_risk", "sum"), exposure=("exposure", "sum"),
+    ).sort_values("at_risk", ascending=False)
+    return plans, sectors, limit
+
+
+def load_day_risk(store, trade_date):
+    """
+    Reads only the risk fields of a day's plans from the store and aggregates them.
+    """
+    columns = [FIELDS_BY_KEY[key].column for key in RISK_FIELDS]
+    plans = store.frame(columns, trade_date=trade_date)
+    plans = plans.rename(columns={FIELDS_BY_KEY[key].column: key for key in RISK_FIELDS})
+    return day_risk(risk_frame(plans))
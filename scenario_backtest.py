@@ -0,0 +1,222 @@
+import datetime
+import operator
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from intraday_levels import read_minute_bars
+from plan_schema import FIELDS_BY_KEY, SCENARIOS
+from risk import parse_prices
+
+METRICS = ["price", "gap_pct", "volume_ratio", "atr_change"]
+LEVELS = [
+    "resistance_2", "resistance_1", "pivot_point", "support_1", "support_2",
+    "previous_day_close", "current_price", "premarket_price", "level_of_interest",
+]
+OPERATORS = {">=": operator.ge, "<=": operator.le, ">": operator.gt, "<": operator.lt}
+ATR_BARS = 14
+
+_CLAUSE = re.compile(r"^\s*([\w.\-]+%?)\s*(>=|<=|>|<)\s*([\w.\-]+%?)\s*$")
+
+
+def parse_rule(text):
+    """
+    Parses a scenario's IF Rule into a list of (left, op, right) comparisons,
+    where each side is a float or a metric/level name. Raises ValueError on
+    invalid rules.
+
+    A rule is one or more comparisons (>, >=, <, <=) joined by "and", e.g.
+    "price > resistance_1 and gap_pct >= 2 and volume_ratio < 0.5". Each side
+    is a number, a plan level (a Section II key such as resistance_1,
+    level_of_interest or premarket_price) or a bar metric:
+
+    - price: the bar's close
+    - gap_pct: the session's opening gap from Previous Day Close, in %
+    - volume_ratio: the bar's volume over the session's average bar volume so far
+    - atr_change: the 14-bar ATR's change since the session's first 14 bars, in %
+    """
+    clauses = []
+    for part in re.split(r"\band\b", text.strip(), flags=re.IGNORECASE):
+        match = _CLAUSE.match(part)
+        if not match:
+            raise ValueError(f"Cannot parse rule clause: {part.strip()!r}")
+        left, op, right = match.groups()
+        clauses.append((_operand(left), op, _operand(right)))
+    return clauses
+
+
+def _operand(token):
+    token = token.rstrip("%")
+    if token.lower() in METRICS or token.lower() in LEVELS:
+        return token.lower()
+    try:
+        return float(token)
+    except ValueError:
+        raise ValueError(f"Unknown metric or level: {token!r}") from None
+
+
+def plan_levels(plans_data):
+    """
+    Returns the plan levels a rule can refer to, one dict (name -> price, NaN
+    if unset) per plan's data. A range such as "123-123.5 range" gives its
+    midpoint.
+    """
+    if not plans_data:
+        return []
+    text = pd.DataFrame([[data.get(FIELDS_BY_KEY[name].column) for name in LEVELS] for data in plans_data], columns=LEVELS)
+    prices = text.apply(parse_prices)
+    # Unset number inputs are saved as 0
+    return prices.where(prices > 0).to_dict("records")
+
+
+def session_metrics(bars, previous_close):
+    """
+    Computes the per-bar metrics of one session's bars (sorted by time).
+    """
+    close = bars["close"].to_numpy(dtype=np.float64)
+    high = bars["high"].to_numpy(dtype=np.float64)
+    low = bars["low"].to_numpy(dtype=np.float64)
+    volume = bars["volume"].to_numpy(dtype=np.float64)
+    opening = bars["open"].to_numpy(dtype=np.float64)[0]
+
+    prior_close = np.r_[opening, close[:-1]]
+    true_range = np.maximum(high, prior_close) - np.minimum(low, prior_close)
+    atr = pd.Series(true_range).rolling(ATR_BARS).mean().to_numpy()
+    gap = (opening / previous_close - 1) * 100 if previous_close else np.nan
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return {
+            "price": close,
+            "gap_pct": np.full(len(close), gap),
+            "volume_ratio": volume / (np.cumsum(volume) / np.arange(1, len(volume) + 1)),
+            "atr_change": (atr / atr[ATR_BARS - 1] - 1) * 100 if len(atr) >= ATR_BARS else np.full(len(close), np.nan),
+        }
+
+
+def evaluate_rule(clauses, metrics, levels):
+    """
+    Returns a boolean array marking the bars on which every clause holds.
+    Comparisons involving an unset level or metric are False.
+    """
+    size = len(metrics["price"])
+    fired = np.ones(size, dtype=bool)
+    for left, op, right in clauses:
+        values = [
+            side if isinstance(side, float) else metrics[side] if side in metrics else levels[side]
+            for side in (left, right)
+        ]
+        with np.errstate(invalid="ignore"):
+            fired &= np.broadcast_to(OPERATORS[op](values[0], values[1]), size)
+    return fired
+
+
+def replay_plan(task, bars):
+    """
+    Replays one plan's testable scenarios over its session bars and returns
+    one result dict per scenario.
+
+    A scenario fires on the first bar where its rule holds. Its THEN Action
+    ("Long" or "Short") is entered at that bar's close and held to the
+    session close.
+    """
+    results = []
+    metrics = session_metrics(bars, task["levels"]["previous_day_close"])
+    close = metrics["price"]
+    for scenario, (clauses, action) in task["rules"].items():
+        fired = np.flatnonzero(evaluate_rule(clauses, metrics, task["levels"]))
+        result = {
+            "plan_id": task["plan_id"], "ticker": task["ticker"], "trade_date": task["trade_date"],
+            "scenario": SCENARIOS[scenario], "action": action, "fired": fired.size > 0,
+            "fired_at": None, "return_pct": np.nan,
+        }
+        if fired.size:
+            entry = close[fired[0]]
+            result["fired_at"] = bars["timestamp"].iloc[fired[0]]
+            if action in ("Long", "Short"):
+                result["return_pct"] = (close[-1] / entry - 1) * 100 * (1 if action == "Long" else -1)
+        results.append(result)
+    return results
+
+
+def replay_session(bars_path, trade_date, tasks):
+    """
+    Replays every plan of one trading day. Runs in a worker process and reads
+    only that day's bars for the plans' tickers.
+    """
+    start = datetime.datetime.fromisoformat(trade_date)
+    bars = read_minute_bars(
+        bars_path, symbols={task["ticker"] for task in tasks},
+        start=start, end=start + datetime.timedelta(days=1),
+        columns=["symbol", "timestamp", "open", "high", "low", "close", "volume"],
+    )
+    sessions = {symbol: frame for symbol, frame in bars.groupby("symbol", sort=False)}
+    results = []
+    for task in tasks:
+        session = sessions.get(task["ticker"])
+        if session is not None and len(session):
+            results.extend(replay_plan(task, session))
+    return results
+
+
+def build_tasks(plans):
+    """
+    Turns stored plans into replay tasks, keeping only the scenarios with a
+    valid IF Rule. Returns (tasks grouped by trade date, list of rule errors).
+    """
+    tasks, errors = [], []
+    for plan in plans:
+        rules = {}
+        for scenario, title in SCENARIOS.items():
+            text = plan.data.get(FIELDS_BY_KEY[f"rule_{scenario}"].column)
+            if not text:
+                continue
+            try:
+                rules[scenario] = (parse_rule(text), plan.data.get(FIELDS_BY_KEY[f"action_{scenario}"].column))
+            except ValueError as e:
+                errors.append(f"Plan #{plan.plan_id} {title}: {e}")
+        if rules:
+            tasks.append((plan, rules))
+    by_date = {}
+    for (plan, rules), levels in zip(tasks, plan_levels([plan.data for plan, _ in tasks])):
+        by_date.setdefault(plan.trade_date, []).append({
+            "plan_id": plan.plan_id, "ticker": plan.ticker, "trade_date": plan.trade_date,
+            "rules": rules, "levels": levels,
+        })
+    return by_date, errors
+
+
+def run_backtest(store, bars_path, start_date, end_date, workers=None):
+    """
+    Replays every plan in [start_date, end_date] across a process pool (one
+    task per trading day).
+
+    Returns (per-plan results, per-scenario summary, rule errors).
+    """
+    by_date, errors = build_tasks(store.plans_between(start_date, end_date))
+    results = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for session_results in pool.map(replay_session, [bars_path] * len(by_date), list(by_date), list(by_date.values())):
+            results.extend(session_results)
+    results = pd.DataFrame(results, columns=[
+        "plan_id", "ticker", "trade_date", "scenario", "action", "fired", "fired_at", "return_pct",
+    ])
+    return results, summarize(results), errors
+
+
+def summarize(results):
+    """
+    Aggregates replay results per scenario: how often it fired and what its
+    THEN Action returned when it did.
+    """
+    # An empty frame's "fired" column is object-typed, and would select columns instead of rows
+    fired = results[results["fired"].astype(bool)]
+    summary = pd.DataFrame({
+        "plans": results.groupby("scenario").size(),
+        "fired": fired.groupby("scenario").size(),
+        "avg_return_pct": fired.groupby("scenario")["return_pct"].mean(),
+        "win_rate": fired.dropna(subset=["return_pct"]).groupby("scenario")["return_pct"].apply(lambda r: (r > 0).mean()),
+    })
+    summary["fired"] = summary["fired"].fillna(0).astype(int)
+    summary.insert(2, "fire_rate", summary["fired"] / summary["plans"])
+    return summary.reset_index(names="scenario")
@@ -0,0 +1,33 @@
+import streamlit as st
+
+from plan_store import DEFAULT_OWNER, PlanStore
+
+def _remember_trader():
+    st.session_state["trader"] = st.session_state["_trader"].strip()
+
+def trader_namespace():
+    """
+    Renders the sidebar "Trader" input shared by all pages and returns the
+    namespace plans are saved under: the trader's name, or DEFAULT_OWNER when
+    no name is given.
+    """
+    st.session_state.setdefault("trader", "")
+
+    # The widget key is separate from "trader" so the name survives page switches
+    st.sidebar.text_input(
+        "Trader", value=st.session_state["trader"], key="_trader", on_change=_remember_trader,
+        placeholder=DEFAULT_OWNER,
+        help=(
+            "Plans are saved and listed per trader. Without a name, they go to the shared "
+            f'"{DEFAULT_OWNER}" trader, together with the plans saved before there were traders.'
+        ),
+    )
+    if not st.session_state["trader"]:
+        st.sidebar.caption(f'Saving as "{DEFAULT_OWNER}", which everyone without a Trader name shares.')
+    return st.session_state["trader"] or DEFAULT_OWNER
+
+def current_store():
+    """
+    Returns the plan store scoped to the current trader.
+    """
+    return PlanStore(owner=trader_namespace())